@@ -17,16 +17,20 @@ HEADERS = {
 class BikeServiceProxy:
 
     def __init__(self):
-        service_page_content = requests.get(SERVICE_URL, headers=HEADERS).content.decode('utf-8')
-        locations_csv_key = self._get_key_to_resource_from_service_page(service_page_content, LOCATIONS_CSV_KEY_PATTERN)
-        locations_csv_url = f'{LOCATIONS_CSV_URL_BASE}{locations_csv_key}'
-        locations_csv_binary = requests.get(locations_csv_url, headers=HEADERS).content
-        self.current_locations_file = io.StringIO(locations_csv_binary.decode('utf-8'))
+        with requests.Session() as session:
+            session.headers.update(HEADERS)
 
-        locations_js_key = self._get_key_to_resource_from_service_page(service_page_content, LOCATIONS_JS_KEY_PATTERN)
-        locations_js_url = f'{LOCATIONS_JS_URL_BASE}{locations_js_key}'
+            service_page_content = session.get(SERVICE_URL).content.decode('utf-8')
+            locations_csv_key = self._get_key_to_resource_from_service_page(service_page_content, LOCATIONS_CSV_KEY_PATTERN)
+            locations_csv_url = f'{LOCATIONS_CSV_URL_BASE}{locations_csv_key}'
+            locations_csv_binary = session.get(locations_csv_url).content
+            self.current_locations_file = io.StringIO(locations_csv_binary.decode('utf-8'))
+
+            locations_js_key = self._get_key_to_resource_from_service_page(service_page_content, LOCATIONS_JS_KEY_PATTERN)
+            locations_js_url = f'{LOCATIONS_JS_URL_BASE}{locations_js_key}'
+
+            locations_response = session.get(locations_js_url)
 
-        locations_response = requests.get(locations_js_url, headers=HEADERS)
         batteries_data = self._parse_response_to_batteries_data(locations_response)
 
         self.parsed_batteries_info = {}
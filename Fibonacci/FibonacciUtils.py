@@ -14,6 +14,7 @@ from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
 import logging
+import math
 import sys
 
 # Konfiguracja loggingu
@@ -208,7 +209,8 @@ def is_fibonacci(num: int) -> bool:
         return False
 
     def is_perfect_square(x):
-        root = int(x ** 0.5)
+        # isqrt jest dokładny także dla dużych liczb (float traci precyzję > 2^53)
+        root = math.isqrt(x)
         return root * root == x
 
     return is_perfect_square(5 * num * num + 4) or \
@@ -11,6 +11,7 @@ Generuje unikalne (prymitywne) trójki pitagorejskie ze szczegółową analizą:
 """
 
 import math
+from itertools import compress
 from typing import List, Tuple, Set, Dict
 from datetime import datetime
 
@@ -67,15 +68,18 @@ def sieve_of_eratosthenes(limit: int) -> Set[int]:
     if limit < 2:
         return set()
     
-    is_prime = [True] * (limit + 1)
-    is_prime[0] = is_prime[1] = False
+    # Tylko liczby nieparzyste: is_prime[i] odpowiada liczbie 2*i + 1
+    size = (limit + 1) // 2
+    is_prime = bytearray([1]) * size
+    is_prime[0] = 0  # 1 nie jest pierwsza
     
-    for i in range(2, math.isqrt(limit) + 1):
+    for i in range(1, (math.isqrt(limit) + 1) // 2):
         if is_prime[i]:
-            for j in range(i * i, limit + 1, i):
-                is_prime[j] = False
+            p = 2 * i + 1
+            # Kolejne nieparzyste wielokrotności p*p, p*p + 2p, ... leżą co p indeksów
+            is_prime[p * p // 2::p] = bytes(len(range(p * p // 2, size, p)))
     
-    return {num for num, prime in enumerate(is_prime) if prime}
+    return {2} | set(compress(range(1, limit + 1, 2), is_prime))
 
 
 def generate_primitive_triples(count: int) -> List[PythagoreanTriple]:
@@ -102,17 +106,18 @@ def generate_primitive_triples(count: int) -> List[PythagoreanTriple]:
     
     # Kontynuuj, dopóki nie będzie wystarczająco trójek
     while len(triples) < count:
-        for n in range(1, m):
-            # Sprawdź warunki dla trójki prymitywnej
-            if (m - n) % 2 == 0:  # m i n muszą mieć różną parzystość
-                continue
+        m2 = m * m
+        # Krok 2 od n = 1 (m parzyste) lub n = 2 (m nieparzyste) wymusza
+        # różną parzystość m i n bez sprawdzania każdej pary
+        for n in range(1 + (m & 1), m, 2):
             if math.gcd(m, n) != 1:  # m i n muszą być względnie pierwsze
                 continue
             
             # Wzór Euklidesa dla trójki prymitywnej
-            a = m * m - n * n
+            n2 = n * n
+            a = m2 - n2
             b = 2 * m * n
-            c = m * m + n * n
+            c = m2 + n2
             
             # Upewnij się, że a < b dla spójności
             if a > b:
@@ -9,93 +9,777 @@ dla bardzo dużych zakresów.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional, Sequence
+from itertools import compress, islice
+from bisect import bisect_right
+from collections import deque
+import os
 import sys
 import math
+import time
 import logging
+import platform
 
+# Na PyPy pętle w czystym Pythonie kompiluje JIT, a NumPy (przez cpyext) jest wolniejszy
+_IS_PYPY = platform.python_implementation() == 'PyPy'
 
-def generate_primes_segmented(limit: int, verbose: bool = False) -> list[int]:
+if _IS_PYPY:
+    np = None
+else:
+    try:
+        import numpy as np
+    except ImportError:  # NumPy jest opcjonalny - bez niego działa wersja w czystym Pythonie
+        np = None
+
+# bitarray (C) daje sicie bez NumPy bit zamiast bajtu na liczbę nieparzystą;
+# na PyPy wywołania rozszerzeń C przez cpyext są wolne, więc zostaje bytearray
+bitarray = None
+if not _IS_PYPY:
+    try:
+        from bitarray import bitarray
+    except ImportError:  # bitarray jest opcjonalny - bez niego sito używa bytearray
+        pass
+
+try:
+    from numba import get_num_threads, njit, prange
+    _HAS_NUMBA = np is not None
+except ImportError:  # Numba jest opcjonalna - kompiluje rdzeń sita (standardowego i segmentowanego)
+    prange = range
+    _HAS_NUMBA = False
+
+
+def _cache_size(level: int, default: int) -> int:
     """
-    Generuje liczby pierwsze używając segmentowanego sita dla bardzo dużych limitów.
-    Używa znacznie mniej pamięci niż standardowe sito.
+    Zwraca rozmiar pamięci podręcznej danych CPU danego poziomu w bajtach.
+
+    Najpierw pyta os.sysconf, potem /sys (Linux); przy braku danych zwraca default.
+    Jeśli rdzeń ma kilka wątków SMT, dzielą one cache, więc wynik jest dzielony
+    przez liczbę wątków na rdzeń.
+
+    Args:
+        level: Poziom cache (1 = L1d, 2 = L2)
+        default: Wartość zastępcza w bajtach
+
+    Returns:
+        Rozmiar cache przypadający na jeden wątek
+    """
+    size = 0
+    name = 'SC_LEVEL1_DCACHE_SIZE' if level == 1 else f'SC_LEVEL{level}_CACHE_SIZE'
+    try:
+        size = os.sysconf(name)
+    except (ValueError, OSError):
+        pass
+
+    cpu_dir = '/sys/devices/system/cpu/cpu0'
+    if size <= 0:
+        for index in range(8):
+            cache_dir = os.path.join(cpu_dir, 'cache', f'index{index}')
+            try:
+                with open(os.path.join(cache_dir, 'level')) as f:
+                    if int(f.read()) != level:
+                        continue
+                with open(os.path.join(cache_dir, 'type')) as f:
+                    if f.read().strip() == 'Instruction':
+                        continue
+                with open(os.path.join(cache_dir, 'size')) as f:
+                    text = f.read().strip().upper()
+            except (OSError, ValueError):
+                break
+            units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+            size = int(text[:-1]) * units[text[-1]] if text[-1] in units else int(text)
+            break
+
+    if size <= 0:
+        return default
+
+    # Wątki SMT jednego rdzenia współdzielą L1/L2
+    try:
+        with open(os.path.join(cpu_dir, 'topology', 'thread_siblings_list')) as f:
+            siblings = sum(
+                int(b) - int(a) + 1 if '-' in part else 1
+                for part in f.read().strip().split(',')
+                for a, _, b in [part.partition('-')]
+            )
+    except (OSError, ValueError):
+        siblings = 1
+    return size // max(siblings, 1)
+
+
+# Połowa L2 na segment: reszta zostaje dla liczb pierwszych przesiewających i wyników.
+# Wyrównane do linii cache (64 B). Segment wielkości L1 jest tu wolniejszy (zmierzone:
+# ~15% dla 2e9, ~30% dla 1e10) - bajt koła obejmuje 30 liczb, więc większość liczb
+# pierwszych do √n ma krok dłuższy niż taki segment, a wyznaczanie ich 8 punktów
+# startowych w każdym segmencie kosztuje więcej niż zysk z trafień w L1.
+SEGMENT_BYTES = max(_cache_size(2, 256 * 1024) // 2 // 64 * 64, 64 * 1024)
+
+
+def _jit(**options):
+    """Dekorator: kompiluje funkcję Numbą (jeśli jest dostępna), inaczej zostawia zwykły Python."""
+    def decorate(func):
+        if not _HAS_NUMBA:
+            return func
+        # cache=True zapisuje kod maszynowy między uruchomieniami
+        return njit(cache=True, boundscheck=False, **options)(func)
+    return decorate
+
+
+# Koło mod 30: bajt mapy opisuje 30 kolejnych liczb, bit k - liczbę z resztą _WHEEL[k]
+# (jedyne reszty względnie pierwsze z 2, 3 i 5). Liczby 2, 3, 5 są dopisywane osobno.
+_WHEEL = (1, 7, 11, 13, 17, 19, 23, 29)
+_WHEEL_BIT = tuple(_WHEEL.index(r) if r in _WHEEL else -1 for r in range(30))
+_WHEEL_PRIMES = (2, 3, 5)
+
+
+def _wheel_starts(p: int) -> Iterator[tuple[int, int]]:
+    """
+    Zwraca 8 par (liczba, bit) - pierwsze wielokrotności p >= p*p z każdej reszty koła.
+
+    Kolejne wielokrotności o tej samej reszcie są odległe o 30p, czyli dokładnie
+    p bajtów mapy, więc każda para wyznacza jeden wycinek z krokiem p.
+    """
+    for r in _WHEEL:
+        q = p * (p + (r - p) % 30)
+        yield q, _WHEEL_BIT[q % 30]
+
+
+# Liczby pierwsze wstępnie wykreślone we wzorcu (pre-sieving). Ich wielokrotności
+# powtarzają się na mapie koła co 7*11*13*17 = 17017 bajtów (~17 KB).
+_PRESIEVE_PRIMES = (7, 11, 13, 17)
+
+
+def _presieve_pattern():
+    """
+    Buduje wzorzec mapy koła z wykreślonymi wielokrotnościami _PRESIEVE_PRIMES.
+
+    Bajt i wzorca odpowiada bajtom i, i + 17017, i + 2*17017, ... mapy, więc
+    segment zaczynający się od dowolnego bajtu jest kopią wzorca z przesunięciem
+    zamiast ponownego wykreślania najgęstszych wielokrotności.
+
+    Returns:
+        Tablica uint8 długości 17017 (zawiera też wykreślone same 7, 11, 13, 17)
+    """
+    pattern = np.full(math.prod(_PRESIEVE_PRIMES), 0xFF, dtype=np.uint8)
+    for p in _PRESIEVE_PRIMES:
+        # p*r dla reszt koła r trafia w każdy bit dokładnie raz na p bajtów
+        for r in _WHEEL:
+            q = p * r
+            pattern[q // 30::p] &= ~(1 << _WHEEL_BIT[q % 30]) & 0xFF
+    return pattern
+
+
+_PRESIEVE = _presieve_pattern() if np is not None else None
+
+
+def _presieve_candidates() -> bytes:
+    """
+    Wzorzec pre-sieving dla segmentów w czystym Pythonie: bajt na kandydata koła.
+
+    Odpowiednik _presieve_pattern w układzie bytearray (8 bajtów na 30 liczb):
+    bajt 8*i + k odpowiada bitowi k bajtu i mapy koła.
+
+    Returns:
+        bytes długości 8 * 17017 z zerami na wielokrotnościach _PRESIEVE_PRIMES
+    """
+    pattern = bytearray(b'\x01') * (8 * math.prod(_PRESIEVE_PRIMES))
+    for p in _PRESIEVE_PRIMES:
+        step = 8 * p
+        for r in _WHEEL:
+            q = p * r
+            first = 8 * (q // 30) + _WHEEL_BIT[q % 30]
+            pattern[first::step] = bytes((len(pattern) - first - 1) // step + 1)
+    return bytes(pattern)
+
+
+@_jit()
+def _fill_presieved(segment, size: int, first_byte: int, pattern) -> None:
+    """Wypełnia segment[:size] wzorcem pre-sieving od bajtu mapy first_byte (z zawijaniem)."""
+    period = pattern.size
+    offset = first_byte % period
+    i = 0
+    while i < size:
+        n = min(period - offset, size - i)
+        segment[i:i + n] = pattern[offset:offset + n]
+        i += n
+        offset = 0
+
+
+@_jit()
+def _mark_segment(low: int, high: int, siever_primes, segment, presieve) -> int:
+    """
+    Przesiewa segment [low, high] na kole mod 30; bit k segment[i] odpowiada low + 30*i + _WHEEL[k].
+
+    Args:
+        low, high: Granice segmentu (włącznie, low podzielne przez 30; pusty gdy low > high)
+        siever_primes: Stała tablica int64 liczb pierwszych od 19 do √limit
+            (2..5 pomija koło, 7..17 są już we wzorcu)
+        segment: Bufor uint8 o długości >= (high - low) // 30 + 1 (nadpisywany)
+        presieve: Wzorzec _PRESIEVE z wykreślonymi wielokrotnościami 7, 11, 13, 17
+
+    Returns:
+        Liczba liczb pierwszych w segmencie (bez 2, 3, 5)
+    """
+    if high < low:
+        return 0
+    size = (high - low) // 30 + 1
+    _fill_presieved(segment, size, low // 30, presieve)
+    offsets = np.empty(8, dtype=np.int64)
+    masks = np.empty(8, dtype=np.uint8)
+
+    for p in siever_primes:
+        if p * p > high:
+            break  # Ta i większe liczby pierwsze nie mają wielokrotności >= p*p w segmencie
+        # Pierwsza wielokrotność z każdej z 8 reszt koła: bajt i maska. Wszystkie
+        # leżą w jednym obrocie koła (p bajtów) od najwcześniejszej z nich
+        m0 = max(p, (low + p - 1) // p)
+        first = size
+        for k in range(8):
+            q = p * (m0 + (_WHEEL[k] - m0) % 30)
+            offsets[k] = (q - low) // 30
+            masks[k] = ~(1 << _WHEEL_BIT[q % 30]) & 0xFF
+            first = min(first, offsets[k])
+        o0, o1, o2, o3 = offsets[0] - first, offsets[1] - first, offsets[2] - first, offsets[3] - first
+        o4, o5, o6, o7 = offsets[4] - first, offsets[5] - first, offsets[6] - first, offsets[7] - first
+        k0, k1, k2, k3, k4, k5, k6, k7 = masks[0], masks[1], masks[2], masks[3], masks[4], masks[5], masks[6], masks[7]
+
+        # Pętla rozwinięta 8x: jeden obrót koła (30p liczb = p bajtów) na iterację
+        j = first
+        while j + p <= size:
+            segment[j + o0] &= k0
+            segment[j + o1] &= k1
+            segment[j + o2] &= k2
+            segment[j + o3] &= k3
+            segment[j + o4] &= k4
+            segment[j + o5] &= k5
+            segment[j + o6] &= k6
+            segment[j + o7] &= k7
+            j += p
+        # Niepełny ostatni obrót
+        for k in range(8):
+            if j + offsets[k] - first < size:
+                segment[j + offsets[k] - first] &= masks[k]
+
+    # Wyzeruj bity ostatniego bajtu leżące powyżej high
+    base = low + 30 * (size - 1)
+    for k in range(8):
+        if base + _WHEEL[k] > high:
+            segment[size - 1] &= ~(1 << k) & 0xFF
+
+    count = 0
+    for i in range(size):
+        v = segment[i]
+        while v:
+            v &= v - 1
+            count += 1
+    return count
+
+
+@_jit()
+def _collect_segment(low: int, size: int, segment, primes, offset: int) -> None:
+    """Zapisuje liczby pierwsze przesianego segmentu (size bajtów) do primes[offset:]."""
+    k = offset
+    for i in range(size):
+        v = segment[i]
+        for b in range(8):
+            if v >> b & 1:
+                primes[k] = low + 30 * i + _WHEEL[b]
+                k += 1
+
+
+@_jit(parallel=True)
+def _sieve_segment_batch(first_low: int, limit: int, segment_size: int,
+                         siever_primes, buffers, presieve):
+    """
+    Przesiewa równolegle (prange) kolejne segmenty od first_low - jeden wiersz buffers na segment.
+
+    first_low i segment_size są podzielne przez 30, więc każdy segment zaczyna
+    się na granicy bajtu koła.
+
+    Segmenty są niezależne: każdy wątek czyta wspólne siever_primes i pisze
+    tylko do swojego wiersza, a wynik jest składany w kolejności segmentów.
+
+    Returns:
+        Tablica int64 liczb pierwszych z przetworzonych segmentów (rosnąco)
+    """
+    batch = buffers.shape[0]
+    counts = np.zeros(batch + 1, dtype=np.int64)
+    for s in prange(batch):
+        low = first_low + s * segment_size
+        high = min(low + segment_size - 1, limit)
+        counts[s + 1] = _mark_segment(low, high, siever_primes, buffers[s], presieve)
+
+    offsets = np.cumsum(counts)
+    primes = np.empty(offsets[batch], dtype=np.int64)
+    for s in prange(batch):
+        low = first_low + s * segment_size
+        high = min(low + segment_size - 1, limit)
+        if high >= low:
+            _collect_segment(low, (high - low) // 30 + 1, buffers[s], primes, offsets[s])
+    return primes
+
+
+class ProgressLine:
+    """
+    Postęp w jednej linii terminala (nadpisywanej przez \\r), najwyżej 10 razy na sekundę.
+
+    Gdy wyjście nie jest terminalem (np. przekierowanie do pliku), postęp jest
+    pomijany, aby nie zaśmiecać logu znakami \\r.
+    """
+
+    INTERVAL = 0.1  # Minimalny odstęp między odświeżeniami (s)
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled and sys.stdout.isatty()
+        self._last = 0.0
+        self._width = 0
+
+    def due(self) -> bool:
+        """Sprawdza, czy minął interwał od ostatniego odświeżenia."""
+        if not self.enabled:
+            return False
+        now = time.monotonic()
+        if now - self._last < self.INTERVAL:
+            return False
+        self._last = now
+        return True
+
+    def write(self, message: str) -> None:
+        """Nadpisuje linię postępu (w pętlach wywoływać po due() == True)."""
+        if not self.enabled:
+            return
+        self._width = max(self._width, len(message))
+        sys.stdout.write(message + '\r')
+        sys.stdout.flush()
+
+    def clear(self) -> None:
+        """Czyści linię postępu."""
+        if self.enabled and self._width:
+            sys.stdout.write(' ' * self._width + '\r')
+            sys.stdout.flush()
+
+
+def iter_primes_segmented(limit: int, verbose: bool = False) -> Iterator:
+    """
+    Generuje liczby pierwsze segmentowanym sitem, porcja po porcji.
+
+    W pamięci jest naraz tylko jedna porcja i liczby pierwsze do √limit, więc
+    wszystkie liczby pierwsze można przetworzyć strumieniowo bez ich gromadzenia.
 
     Args:
         limit: Górna granica generowania liczb pierwszych (włącznie)
         verbose: Jeśli True, wyświetla postęp
 
-    Returns:
-        Lista wszystkich liczb pierwszych od 2 do limit
+    Yields:
+        Kolejne rosnące porcje liczb pierwszych od 2 do limit - tablice NumPy
+        int64 (lub listy, gdy NumPy jest niedostępny)
 
     Złożoność:
         Czas: O(n log log n)
         Pamięć: O(√n) zamiast O(n)
     """
     if limit < 2:
-        return []
+        return
 
-    sqrt_limit = int(math.sqrt(limit))
+    sqrt_limit = math.isqrt(limit)
+    # Segmenty zaczynają się na wielokrotnościach 30 (granica bajtu koła)
+    low = (sqrt_limit // 30 + 1) * 30
 
     # Krok 1: Znajdź małe liczby pierwsze do √limit używając standardowego sita
     if verbose:
         print(f"Faza 1/2: Wyszukiwanie podstawowych liczb pierwszych do {sqrt_limit:,}...")
 
-    result = generate_primes(sqrt_limit, verbose=False)
+    # Z NumPy od razu tablica int64 z mapy bitowej - bez listy obiektów int
+    base_primes = generate_primes(min(low - 1, limit), verbose=False, as_array=True)
+    yield base_primes
 
     # Krok 2: Przetwarzaj segmenty
-    segment_size = max(sqrt_limit, 1_000_000)  # Co najmniej 1M dla wydajności
-    low = sqrt_limit + 1
-
-    total_segments = math.ceil((limit - sqrt_limit) / segment_size)
+    segment_size = _segment_size(sqrt_limit)
 
     if verbose:
+        total_segments = max(math.ceil((limit - low + 1) / segment_size), 0)
         print(f"Faza 2/2: Przetwarzanie {total_segments} segmentów o rozmiarze {segment_size:,}...")
 
+    siever_primes = base_primes[:bisect_right(base_primes, sqrt_limit)]
+    for chunk in _iter_segments(siever_primes, low, limit, segment_size, verbose):
+        yield np.asarray(chunk, dtype=np.int64) if np is not None else chunk
+
+
+def generate_primes_segmented(limit: int, verbose: bool = False,
+                              as_array: bool = False) -> Sequence[int]:
+    """
+    Generuje liczby pierwsze używając segmentowanego sita dla bardzo dużych limitów.
+    Używa znacznie mniej pamięci niż standardowe sito.
+
+    Args:
+        limit: Górna granica generowania liczb pierwszych (włącznie)
+        verbose: Jeśli True, wyświetla postęp
+        as_array: Jeśli True (i jest NumPy), zwraca tablicę int64 zamiast listy -
+            8 bajtów na liczbę pierwszą zamiast ~36 dla obiektów int w liście
+
+    Returns:
+        Lista (lub tablica NumPy) wszystkich liczb pierwszych od 2 do limit
+
+    Złożoność:
+        Czas: O(n log log n)
+        Pamięć: O(n) na wynik, O(√n) na samo sito (strumieniowo: iter_primes_segmented)
+    """
+    chunks = iter_primes_segmented(limit, verbose)
+
+    if np is not None and as_array:
+        return np.concatenate([np.empty(0, dtype=np.int64), *chunks])
+
+    # Jedno extend na porcję zamiast append na liczbę pierwszą
+    result = []
+    for chunk in chunks:
+        result.extend(chunk.tolist() if np is not None else chunk)
+    return result
+
+
+class SegmentedPrimes:
+    """
+    Liczby pierwsze do limitu z sita segmentowanego - bez trzymania ich w pamięci.
+
+    Konstruktor przesiewa zakres raz strumieniowo, zapamiętując tylko liczbę
+    liczb pierwszych oraz pierwsze i ostatnie HEAD_TAIL z nich (to, czego
+    potrzebują statystyki). Obiekt zachowuje się jak sekwencja (len, indeksy,
+    krótkie wycinki, iteracja); iteracja i indeksy spoza początku/końca
+    przesiewają zakres ponownie.
+    """
+
+    __slots__ = ('limit', '_count', '_head', '_tail')
+
+    HEAD_TAIL = 10
+
+    def __init__(self, limit: int, verbose: bool = False):
+        self.limit = limit
+        self._count = 0
+        self._head: list[int] = []
+        tail: deque = deque(maxlen=self.HEAD_TAIL)
+        for chunk in iter_primes_segmented(limit, verbose):
+            self._count += len(chunk)
+            if len(self._head) < self.HEAD_TAIL:
+                self._head.extend(int(p) for p in chunk[:self.HEAD_TAIL - len(self._head)])
+            tail.extend(int(p) for p in chunk[-self.HEAD_TAIL:])
+        self._tail = list(tail)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[int]:
+        for chunk in self.iter_chunks():
+            yield from (chunk.tolist() if np is not None else chunk)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            # Przeznaczone dla krótkich wycinków (np. pierwsze/ostatnie 10)
+            return [self[i] for i in range(*key.indices(len(self)))]
+        index = key + len(self) if key < 0 else key
+        if not 0 <= index < len(self):
+            raise IndexError("SegmentedPrimes index out of range")
+        if index < len(self._head):
+            return self._head[index]
+        if index >= len(self) - len(self._tail):
+            return self._tail[index - (len(self) - len(self._tail))]
+        return next(islice(iter(self), index, None))
+
+    def max(self) -> int:
+        """Zwraca największą liczbę pierwszą."""
+        return self[-1]
+
+    def iter_chunks(self) -> Iterator:
+        """Przesiewa zakres ponownie i zwraca kolejne porcje liczb pierwszych."""
+        return iter_primes_segmented(self.limit)
+
+
+def _segment_size(sqrt_limit: int) -> int:
+    """
+    Zwraca rozmiar segmentu (w liczbach, wielokrotność 30) dla sita segmentowanego.
+
+    Bufor segmentu mieści się w połowie L2: z Numbą bajt koła opisuje 30 liczb,
+    w czystym Pythonie bytearray ma bajt na kandydata koła (8 na 30 liczb).
+    """
+    numbers_per_byte = 30 if _HAS_NUMBA else 30 / 8
+    segment_size = max(sqrt_limit, int(numbers_per_byte * SEGMENT_BYTES))
+    return -(-segment_size // 30) * 30
+
+
+def _iter_segments(siever_primes: list[int], low: int, limit: int, segment_size: int,
+                   verbose: bool = False) -> Iterator:
+    """
+    Przesiewa segmentami zakres [low, limit] i zwraca kolejne porcje znalezionych liczb pierwszych.
+
+    Args:
+        siever_primes: Rosnąca lista (lub tablica NumPy) wszystkich liczb pierwszych do √limit
+        low: Początek zakresu (wielokrotność 30)
+        limit: Koniec zakresu (włącznie)
+        segment_size: Rozmiar segmentu z _segment_size
+        verbose: Jeśli True, wyświetla postęp
+
+    Yields:
+        Porcje rosnących liczb pierwszych - tablice int64 (Numba) lub listy
+    """
+    total_segments = max(math.ceil((limit - low + 1) / segment_size), 1)
+
+    # Liczby pierwsze wykreślające są ustalone raz, przed pętlą - pętle segmentów
+    # przechodzą całe stałe tablice bez sprawdzania granicy √limit
+    if _HAS_NUMBA:
+        # Jeden wiersz bufora na wątek - tyle segmentów przetwarza naraz prange
+        sievers = np.asarray(siever_primes[bisect_right(siever_primes, 17):], dtype=np.int64)
+        buffers = np.empty((get_num_threads(), segment_size // 30), dtype=np.uint8)
+    else:
+        # Jeden bufor bajtów na wszystkie segmenty - bajt na kandydata koła mod 30
+        # (8 na 30 liczb): segment[8*b + k] odpowiada liczbie low + 30*b + _WHEEL[k]
+        # Bez 2, 3, 5 (koło) i 7..17 (wzorzec); int zamiast np.int64 - szybsza
+        # arytmetyka w pętli Pythona
+        sievers = [int(p) for p in siever_primes[bisect_right(siever_primes, 17):]]
+        segment = bytearray(segment_size // 30 * 8)
+        numbers = [30 * (i >> 3) + _WHEEL[i & 7] for i in range(len(segment))]
+        # Wzorzec powielony tak, by każdy segment był jednym wycinkiem od dowolnego przesunięcia
+        pattern = _presieve_candidates()
+        period = len(pattern) // 8
+        presieved = memoryview(pattern * (len(segment) // len(pattern) + 2))
+        zeros = memoryview(bytes(len(segment)))
+        # Lokalne nazwy zamiast globalnych i atrybutów modułu w gorącej pętli
+        # (mniej słowników do przeszukania w CPythonie, mniej strażników w JIT PyPy)
+        wheel, wheel_bit, isqrt = _WHEEL, _WHEEL_BIT, math.isqrt
+
+    progress = ProgressLine(verbose)
     segment_num = 0
     while low <= limit:
-        high = min(low + segment_size - 1, limit)
-        segment_num += 1
+        if _HAS_NUMBA:
+            # Skompilowany rdzeń Numby: segmenty równolegle na wszystkich rdzeniach
+            yield _sieve_segment_batch(
+                low, limit, segment_size, sievers, buffers, _PRESIEVE
+            )
+            high = min(low + len(buffers) * segment_size - 1, limit)
+            segment_num = min(segment_num + len(buffers), total_segments)
+        else:
+            high = min(low + segment_size - 1, limit)
+            segment_num += 1
+
+            # Zainicjuj sito segmentu wzorcem z wykreślonymi 7..17 (low jest wielokrotnością 30)
+            size = ((high - low) // 30 + 1) * 8
+            offset = low // 30 % period * 8
+            segment[:size] = presieved[offset:offset + size]
+
+            # Oznacz wielokrotności podstawowych liczb pierwszych: dla każdej z 8 reszt
+            # koła kolejne wielokrotności leżą co 30p liczb = 8p pozycji segmentu
+            # Liczby pierwsze powyżej √high nie mają wielokrotności >= p*p w tym segmencie
+            for prime in islice(sievers, bisect_right(sievers, isqrt(high))):
+                step = 8 * prime
+                m0 = max(prime, (low + prime - 1) // prime)
+                for r in wheel:
+                    q = prime * (m0 + (r - m0) % 30)
+                    first = 8 * ((q - low) // 30) + wheel_bit[q % 30]
+                    # Jedno przypisanie wycinka (pętla w C) zamiast pętli w Pythonie
+                    if first < size:
+                        segment[first:size:step] = zeros[:(size - first - 1) // step + 1]
+
+            # Kandydaci ostatniego bajtu koła mogą leżeć powyżej high
+            for i in range(size - 8, size):
+                if low + numbers[i] > high:
+                    segment[i] = 0
+
+            # Zbierz liczby pierwsze z tego segmentu
+            yield [low + n for n in compress(numbers[:size], segment)]
+
+        if progress.due():
+            percent = (segment_num / total_segments) * 100
+            progress.write(f"Postęp: {percent:.1f}% (przetworzono do {high:,})")
 
-        # Utwórz sito segmentu
-        segment = [True] * (high - low + 1)
+        low = high + 1
 
-        # Oznacz wielokrotności podstawowych liczb pierwszych w tym segmencie
-        for prime in result:
-            if prime > sqrt_limit:
-                break
-            # Znajdź pierwszą wielokrotność liczby pierwszej w [low, high]
-            start = max(prime * prime, ((low + prime - 1) // prime) * prime)
+    progress.clear()
 
-            for j in range(start, high + 1, prime):
-                segment[j - low] = False
 
-        # Zbierz liczby pierwsze z tego segmentu
-        for i in range(len(segment)):
-            if segment[i]:
-                result.append(low + i)
+def generate_primes_segmented_continue(primes: list[int], old_limit: int, new_limit: int,
+                                       verbose: bool = False) -> list[int]:
+    """
+    Rozszerza listę wszystkich liczb pierwszych do old_limit o liczby pierwsze z (old_limit, new_limit].
 
-        if verbose:
-            progress = (segment_num / total_segments) * 100
-            print(f"Postęp: {progress:.1f}% (przetworzono do {high:,})", end='\r', flush=True)
+    Znane liczby pierwsze służą jako podstawowe liczby pierwsze sita, więc
+    przesiewany jest tylko nowy zakres zamiast całości od nowa.
 
-        low = high + 1
+    Args:
+        primes: Lista wszystkich liczb pierwszych do old_limit (rozszerzana w miejscu)
+        old_limit: Dotychczasowa górna granica
+        new_limit: Nowa górna granica (włącznie)
+        verbose: Jeśli True, wyświetla postęp
 
-    if verbose:
-        print(" " * 70, end='\r', flush=True)  # Wyczyść linię postępu
+    Returns:
+        Ta sama lista primes, zawierająca wszystkie liczby pierwsze do new_limit
+    """
+    if new_limit <= old_limit:
+        return primes
+    sqrt_limit = math.isqrt(new_limit)
+    if old_limit < sqrt_limit or old_limit < 30:
+        # Za mało podstawowych liczb pierwszych - przesiej całość
+        primes[:] = generate_primes_segmented(new_limit, verbose)
+        return primes
+
+    # Segmenty zaczynają się na granicy bajtu koła, więc mogą powtórzyć końcówkę
+    # starego zakresu - te liczby są usuwane po przesianiu
+    count = len(primes)
+    siever_primes = primes[:bisect_right(primes, sqrt_limit)]
+    for chunk in _iter_segments(siever_primes, (old_limit + 1) // 30 * 30, new_limit,
+                                _segment_size(sqrt_limit), verbose):
+        primes.extend(chunk.tolist() if _HAS_NUMBA else chunk)
+    del primes[count:bisect_right(primes, old_limit, lo=count)]
+    return primes
+
+
+def estimate_sieve_mb(limit: int) -> float:
+    """Szacuje pamięć standardowego sita (MB): bajt na 30 liczb z NumPy, na 16 z bitarray, na 2 bez."""
+    if np is not None:
+        bytes_per_number = 1 / 30
+    else:
+        bytes_per_number = 1 / 16 if bitarray is not None else 1 / 2
+    return (limit + 1) * bytes_per_number / 1024 / 1024
 
-    return result
+
+def estimate_segmented_mb(limit: int) -> float:
+    """
+    Szacuje pamięć sita segmentowanego (MB): bufory segmentów, liczby pierwsze
+    do √limit i porcje wyniku (bieżąca i poprzednia, jeszcze przetwarzana).
+    """
+    sqrt_limit = math.isqrt(limit)
+    segment_size = _segment_size(sqrt_limit)
+    # int64 z NumPy, obiekty int w liście bez niego
+    prime_bytes = 8 if np is not None else 36
+    base_bytes = prime_bytes * sqrt_limit / math.log(max(sqrt_limit, 2))
+    if _HAS_NUMBA:
+        segments = get_num_threads()  # Bufor na wątek, porcja z całej partii segmentów
+        buffer_bytes = SEGMENT_BYTES * segments
+    else:
+        segments = 1
+        # Bufor, wzorzec, zera, lista liczb segmentu i obiekty tymczasowe
+        # (~60 B na kandydata koła)
+        buffer_bytes = SEGMENT_BYTES * 60
+    chunk_bytes = 2 * prime_bytes * segments * segment_size / math.log(max(limit, 2))
+    return (buffer_bytes + base_bytes + chunk_bytes) / 1024 / 1024
+
+
+def _sieve_bitmap(limit: int, verbose: bool = False):
+    """
+    Wykonuje Sito Eratostenesa i zwraca mapę pierwszości is_prime[0..limit].
+
+    Args:
+        limit: Górna granica sita (włącznie, limit >= 2)
+        verbose: Jeśli True, wyświetla postęp dla dużych limitów
+
+    Returns:
+        Mapa bitowa koła mod 30 w NumPy (jak w PrimeSieve) lub bitarray/bytearray,
+        gdzie is_prime[i] mówi czy nieparzysta liczba 2*i + 1 jest pierwsza
+
+    Raises:
+        MemoryError: Jeśli limit jest zbyt duży dla dostępnej pamięci
+    """
+    try:
+        if np is None:
+            return _sieve_pure_python(limit, verbose)
+        return _sieve_numpy(limit, verbose)
+    except MemoryError:
+        estimated_mb = estimate_sieve_mb(limit)
+        raise MemoryError(
+            f"Not enough memory to create sieve for {limit:,}. "
+            f"Estimated memory needed: ~{estimated_mb:.1f} MB"
+        )
 
 
-def generate_primes(limit: int, verbose: bool = False) -> list[int]:
+def _sieve_pure_python(limit: int, verbose: bool = False):
+    """
+    Sito bez NumPy - ścieżka dla PyPy i środowisk bez NumPy.
+
+    Z bitarray bit na liczbę nieparzystą (8x mniej pamięci, wykreślanie wycinka
+    w C bez bufora zer), bez niego bytearray - bajt na liczbę nieparzystą.
+    """
+    # Tylko liczby nieparzyste: is_prime[i] odpowiada liczbie 2*i + 1
+    size = (limit + 1) // 2
+    if bitarray is not None:
+        is_prime = bitarray(size)
+        is_prime.setall(1)
+    else:
+        is_prime = bytearray(b'\x01') * size
+        zeros = memoryview(bytes(size))
+    is_prime[0] = 0  # 1 nie jest pierwsza
+    sqrt_limit = math.isqrt(limit)
+    progress = ProgressLine(verbose)
+
+    for i in range(3, sqrt_limit + 1, 2):
+        if is_prime[i >> 1]:
+            # Kolejne nieparzyste wielokrotności i*i, i*i + 2i, ... leżą co i indeksów -
+            # jedno przypisanie wycinka (pętla w C) zamiast pętli w Pythonie
+            first = i * i >> 1
+            if bitarray is not None:
+                is_prime[first::i] = 0
+            else:
+                is_prime[first::i] = zeros[:(size - first - 1) // i + 1]
+
+            if progress.due():
+                percent = (i / sqrt_limit) * 100
+                progress.write(f"Postęp: {percent:.1f}% (sprawdzanie {i:,})")
+
+    progress.clear()
+
+    return is_prime
+
+
+def _sieve_numpy(limit: int, verbose: bool = False):
+    """
+    Sito na mapie bitowej koła mod 30 w NumPy (bajt na 30 liczb, 30x mniej pamięci niż bajt na liczbę).
+
+    Bit k bajtu b odpowiada liczbie 30*b + _WHEEL[k]; 2, 3 i 5 nie są w mapie.
+    Mapa startuje z powielonego wzorca _PRESIEVE (wielokrotności 7..17 już
+    wykreślone). Resztę wykreśla skompilowany rdzeń Numby (cała mapa jako jeden
+    segment), a bez Numby przypisania wycinków z maską bitową.
+    """
+    sqrt_limit = math.isqrt(limit)
+    progress = ProgressLine(verbose)
+
+    if _HAS_NUMBA:
+        # Cała pętla wykreślania w kodzie maszynowym, bez wywołań z Pythona na liczbę pierwszą
+        bits = np.empty(limit // 30 + 1, dtype=np.uint8)
+        sievers = generate_primes(sqrt_limit, as_array=True)
+        _mark_segment(0, limit, sievers[sievers > 17], bits, _PRESIEVE)
+        bits[0] = 0xFE  # 1 nie jest pierwsza, 7, 11, 13, 17 wzorzec wykreślił jako swoje wielokrotności
+    else:
+        bits = np.resize(_PRESIEVE, limit // 30 + 1)
+        bits[0] = 0xFE
+
+        for i in range(19, sqrt_limit + 1, 2):
+            k = _WHEEL_BIT[i % 30]
+            if k >= 0 and bits[i // 30] >> k & 1:
+                # Wielokrotności i z tą samą resztą mod 30 leżą co 30i liczb = i bajtów,
+                # więc wystarczy 8 wycinków (po jednym na resztę koła) z krokiem i bajtów
+                for start, bit in _wheel_starts(i):
+                    mask = ~(1 << bit) & 0xFF
+                    bits[start // 30::i] &= mask
+
+                if progress.due():
+                    percent = (i / sqrt_limit) * 100
+                    progress.write(f"Postęp: {percent:.1f}% (sprawdzanie {i:,})")
+
+    # Wyzeruj bity ostatniego bajtu leżące powyżej limitu
+    for k, r in enumerate(_WHEEL):
+        if (len(bits) - 1) * 30 + r > limit:
+            bits[-1] &= ~(1 << k) & 0xFF
+
+    progress.clear()
+
+    return bits
+
+
+def generate_primes(limit: int, verbose: bool = False, as_array: bool = False) -> Sequence[int]:
     """
     Generuje listę liczb pierwszych do podanego limitu używając Sita Eratostenesa.
 
     Args:
         limit: Górna granica generowania liczb pierwszych (włącznie)
         verbose: Jeśli True, wyświetla postęp dla dużych limitów
+        as_array: Jeśli True (i jest NumPy), zwraca tablicę int64 zamiast listy -
+            8 bajtów na liczbę pierwszą zamiast ~36 dla obiektów int w liście
 
     Returns:
-        Lista wszystkich liczb pierwszych od 2 do limit
+        Lista (lub tablica NumPy) wszystkich liczb pierwszych od 2 do limit
 
     Raises:
         MemoryError: Jeśli limit jest zbyt duży dla dostępnej pamięci
@@ -105,43 +789,226 @@ def generate_primes(limit: int, verbose: bool = False) -> list[int]:
         Pamięć: O(n)
     """
     if limit < 2:
-        return []
+        return np.empty(0, dtype=np.int64) if as_array and np is not None else []
 
-    try:
-        # Inicjalizuj sito
-        is_prime = [True] * (limit + 1)
-        is_prime[0] = is_prime[1] = False
-    except MemoryError:
-        estimated_mb = (limit + 1) / 1024 / 1024
-        raise MemoryError(
-            f"Not enough memory to create sieve for {limit:,}. "
-            f"Estimated memory needed: ~{estimated_mb:.1f} MB"
-        )
+    is_prime = _sieve_bitmap(limit, verbose)
 
-    sqrt_limit = math.isqrt(limit)
+    # Wyodrębnij liczby pierwsze (z NumPy porcjami przez np.unpackbits + np.flatnonzero)
+    if np is not None:
+        primes = PrimeSieve(is_prime, limit)
+        array = primes.to_array()
+        return array if as_array else array.tolist()
+    return [2] + list(compress(range(1, limit + 1, 2), is_prime))
 
-    # Sito Eratostenesa
-    for i in range(2, sqrt_limit + 1):
-        if is_prime[i]:
-            # Oznacz wielokrotności i jako złożone
-            for j in range(i * i, limit + 1, i):
-                is_prime[j] = False
 
-            if verbose and i % 1000 == 0:
-                progress = (i / sqrt_limit) * 100
-                print(f"Postęp: {progress:.1f}% (sprawdzanie {i:,})", end='\r', flush=True)
+class PrimeSieve:
+    """
+    Liczby pierwsze do limitu reprezentowane mapą bitową sita (NumPy).
+
+    Bit k bajtu b mówi, czy liczba 30*b + _WHEEL[k] jest pierwsza (koło mod 30);
+    2, 3 i 5 są dopisywane na początku. Obiekt zachowuje się
+    jak sekwencja posortowanych liczb pierwszych (len, indeksy, krótkie wycinki,
+    iteracja, `in`), ale liczby są wyodrębniane porcjami dopiero gdy są potrzebne.
+    """
+
+    __slots__ = ('bits', 'limit', '_count', '_small')
+
+    CHUNK = 1 << 17  # Rozmiar porcji mapy przy wyodrębnianiu (128 KB = 3.9M liczb)
+
+    def __init__(self, bits, limit: int):
+        self.bits = bits
+        self.limit = limit
+        self._count: Optional[int] = None
+        self._small = [p for p in _WHEEL_PRIMES if p <= limit]
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = sum(self._popcount(start, part) for start, part in self._parts())
+        return self._count
+
+    def __contains__(self, n: int) -> bool:
+        if not 0 <= n <= self.limit:
+            return False
+        k = _WHEEL_BIT[n % 30]
+        if k < 0:
+            return n in self._small
+        return bool(self.bits[n // 30] >> k & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for chunk in self.iter_chunks():
+            yield from chunk.tolist()
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            # Przeznaczone dla krótkich wycinków (np. pierwsze/ostatnie 10)
+            return [self._nth(i) for i in range(*key.indices(len(self)))]
+        index = key + len(self) if key < 0 else key
+        if not 0 <= index < len(self):
+            raise IndexError("PrimeSieve index out of range")
+        return self._nth(index)
+
+    def max(self) -> int:
+        """Zwraca największą liczbę pierwszą w sicie."""
+        return self[-1]
+
+    def to_array(self):
+        """Zwraca wszystkie liczby pierwsze jako jedną tablicę NumPy int64."""
+        return np.concatenate([np.empty(0, dtype=np.int64), *self.iter_chunks()]).astype(np.int64, copy=False)
+
+    def iter_chunks(self) -> Iterator:
+        """Zwraca kolejne porcje liczb pierwszych jako tablice NumPy."""
+        for start, part in self._parts():
+            chunk = self._decode(start, part)
+            if chunk.size:
+                yield chunk
+
+    def _parts(self, reverse: bool = False) -> Iterator:
+        """Zwraca pary (indeks pierwszego bajtu, porcja mapy)."""
+        starts = range(0, len(self.bits), self.CHUNK)
+        for start in (reversed(starts) if reverse else starts):
+            yield start, self.bits[start:start + self.CHUNK]
+
+    def _popcount(self, start: int, part) -> int:
+        """Liczy liczby pierwsze w porcji mapy (pierwsza porcja obejmuje też 2, 3, 5)."""
+        count = int(np.count_nonzero(np.unpackbits(part)))
+        return count + len(self._small) if start == 0 else count
+
+    def _decode(self, start: int, part):
+        """Zamienia ustawione bity porcji (od bajtu start) na liczby pierwsze."""
+        index = np.flatnonzero(np.unpackbits(part, bitorder='little'))
+        primes = ((index >> 3) + start) * 30 + np.asarray(_WHEEL)[index & 7]
+        if start == 0:
+            primes = np.concatenate((np.asarray(self._small, dtype=primes.dtype), primes))
+        return primes
+
+    def _nth(self, index: int) -> int:
+        """Zwraca index-tą liczbę pierwszą (od 0), skanując mapę od bliższego końca."""
+        from_end = index >= len(self) // 2
+        if from_end:
+            index = len(self) - 1 - index
+        for start, part in self._parts(reverse=from_end):
+            found = self._popcount(start, part)
+            if index < found:
+                chunk = self._decode(start, part)
+                return int(chunk[-1 - index] if from_end else chunk[index])
+            index -= found
+        raise IndexError("PrimeSieve index out of range")
+
+
+def sieve_primes(limit: int, verbose: bool = False) -> Sequence[int]:
+    """
+    Jak generate_primes, ale z NumPy zwraca leniwy PrimeSieve zamiast listy.
+
+    Dla dużych limitów oszczędza budowania listy wszystkich liczb pierwszych
+    (~1.4 GB dla limitu 1e9) - wystarczy sama mapa bitowa sita.
+
+    Args:
+        limit: Górna granica generowania liczb pierwszych (włącznie)
+        verbose: Jeśli True, wyświetla postęp dla dużych limitów
+
+    Returns:
+        PrimeSieve (z NumPy) lub lista liczb pierwszych od 2 do limit
+    """
+    if np is None or limit < 2:
+        return generate_primes(limit, verbose)
+    return PrimeSieve(_sieve_bitmap(limit, verbose), limit)
+
+
+# Powyżej tej wartości √n dzielniki wyznacza rozkład na czynniki (Pollard rho)
+# zamiast skanowania wszystkich kandydatów do √n
+_DIVISOR_SCAN_MAX = 1 << 22
+
+# Bazy testu Millera-Rabina - deterministyczny dla n < 3.3 * 10^24
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
 
-    if verbose:
-        print(" " * 50, end='\r', flush=True)  # Wyczyść linię postępu
 
-    # Wyodrębnij liczby pierwsze
-    return [num for num, prime in enumerate(is_prime) if prime]
+def _miller_rabin(n: int) -> bool:
+    """
+    Test pierwszości Millera-Rabina dla nieparzystego n > 41.
+
+    Z bazami _MR_BASES wynik jest pewny dla n < 3.3 * 10^24, powyżej
+    prawdopodobieństwo błędu jest pomijalnie małe (< 4^-13).
+    """
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    for a in _MR_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _pollard_rho(n: int) -> int:
+    """Zwraca nietrywialny dzielnik złożonej, nieparzystej liczby n (wariant Brenta)."""
+    for c in range(1, n):
+        y, r, q, g = 2, 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                # gcd liczone raz na 128 kroków z iloczynu różnic
+                for _ in range(min(128, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += 128
+            r *= 2
+        if g == n:
+            # Iloczyn przeskoczył dzielnik - powtórz krok po kroku
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+    raise ValueError(f"Nie udało się rozłożyć {n}")
+
+
+def _factorize(n: int) -> dict[int, int]:
+    """
+    Rozkłada n >= 1 na czynniki pierwsze.
+
+    Returns:
+        Słownik {liczba pierwsza: wykładnik}
+    """
+    factors: dict[int, int] = {}
+    for p in generate_primes(1000):
+        if p * p > n:
+            break
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if m < 1000 * 1000 or _miller_rabin(m):
+            # Bez dzielników < 1000 liczba poniżej 10^6 jest pierwsza
+            factors[m] = factors.get(m, 0) + 1
+        else:
+            d = _pollard_rho(m)
+            stack += [d, m // d]
+    return factors
 
 
 def get_divisors(n: int, exclude_trivial: bool = False) -> list[int]:
     """
     Znajduje wszystkie dzielniki podanej liczby.
 
+    Dla √n do _DIVISOR_SCAN_MAX sprawdza kandydatów do √n (z NumPy jednym
+    wektorowym modulo), dla większych n buduje dzielniki z rozkładu na czynniki
+    pierwsze (Pollard rho).
+
     Args:
         n: Liczba do sprawdzenia
         exclude_trivial: Jeśli True, wyklucz 1 i samą liczbę n
@@ -150,21 +1017,30 @@ def get_divisors(n: int, exclude_trivial: bool = False) -> list[int]:
         Lista wszystkich dzielników liczby n
 
     Złożoność:
-        Czas: O(√n)
+        Czas: O(√n) dla małych n, ~O(n^(1/4)) przez rozkład dla dużych
     """
     if n < 1:
         return []
     
-    divisors = []
-    sqrt_n = int(math.sqrt(n))
+    sqrt_n = math.isqrt(n)
     
-    for i in range(1, sqrt_n + 1):
-        if n % i == 0:
-            divisors.append(i)
-            if i != n // i:  # Unikaj duplikatów dla liczb kwadratowych
+    if sqrt_n > _DIVISOR_SCAN_MAX:
+        divisors = [1]
+        for p, exp in _factorize(n).items():
+            divisors = [d * p ** e for d in divisors for e in range(exp + 1)]
+    elif np is not None:
+        candidates = np.arange(1, sqrt_n + 1, dtype=np.int64)
+        small = candidates[n % candidates == 0]
+        divisors = np.concatenate((small, n // small)).tolist()
+    else:
+        divisors = []
+        for i in range(1, sqrt_n + 1):
+            if n % i == 0:
+                divisors.append(i)
                 divisors.append(n // i)
     
-    divisors = sorted(divisors)
+    # set usuwa duplikat √n dla liczb kwadratowych
+    divisors = sorted(set(divisors))
     
     if exclude_trivial:
         # Usuń 1 i samą liczbę n
@@ -177,10 +1053,23 @@ def get_divisors(n: int, exclude_trivial: bool = False) -> list[int]:
     return divisors
 
 
+# Liczby pierwsze poniżej tej granicy is_prime sprawdza jednym wyszukaniem w zbiorze
+_SMALL_PRIME_LIMIT = 10_000
+# Zwykłe sito zamiast generate_primes - import nie kompiluje rdzeni Numby
+_SMALL_PRIMES = frozenset([
+    2, *compress(range(1, _SMALL_PRIME_LIMIT, 2), _sieve_pure_python(_SMALL_PRIME_LIMIT - 1))
+])
+
+
 def is_prime(n: int) -> bool:
     """
     Sprawdza, czy podana liczba jest liczbą pierwszą.
 
+    Małe n sprawdza w tablicy _SMALL_PRIMES, reszty mod 30 niewzględnie
+    pierwsze z 30 odrzuca od razu, a resztę rozstrzyga deterministyczny test
+    Millera-Rabina (bazy _MR_BASES) - pewny dla n < 3.3 * 10^24; dla większych n
+    błąd jest pomijalnie mało prawdopodobny.
+
     Args:
         n: Liczba do sprawdzenia
 
@@ -188,22 +1077,21 @@ def is_prime(n: int) -> bool:
         True jeśli liczba jest pierwsza, False w przeciwnym razie
 
     Złożoność:
-        Czas: O(√n)
+        Czas: O(1) dla n < 10 000, O(log³ n) - 13 potęgowań modularnych - powyżej
     """
-    if n < 2:
-        return False
-    if n == 2:
-        return True
-    if n % 2 == 0:
+    if n < _SMALL_PRIME_LIMIT:
+        return n in _SMALL_PRIMES
+
+    # Koło mod 30 odrzuca wielokrotności 2, 3 i 5 (73% liczb) jednym sprawdzeniem
+    if _WHEEL_BIT[n % 30] < 0:
         return False
-    
-    # Sprawdź nieparzystych dzielników do √n
-    sqrt_n = int(math.sqrt(n))
-    for i in range(3, sqrt_n + 1, 2):
-        if n % i == 0:
+
+    # Pozostałe bazy testu sprawdzamy dzieleniem - tanio odrzuca częste dzielniki
+    for p in _MR_BASES[3:]:
+        if n % p == 0:
             return False
-    
-    return True
+
+    return _miller_rabin(n)
 
 
 def first_n_primes(n: int, verbose: bool = False) -> list[int]:
@@ -218,8 +1106,8 @@ def first_n_primes(n: int, verbose: bool = False) -> list[int]:
         Lista pierwszych n liczb pierwszych
 
     Złożoność:
-        Używa przybliżenia n * ln(n) dla górnej granicy i generuje liczby pierwsze
-        używając standardowego sita.
+        Używa oszacowania Dusarta dla górnej granicy n-tej liczby pierwszej
+        i generuje liczby pierwsze używając standardowego sita.
     """
     if n <= 0:
         return []
@@ -228,32 +1116,33 @@ def first_n_primes(n: int, verbose: bool = False) -> list[int]:
     if n == 2:
         return [2, 3]
 
-    # Przybliżona górna granica dla n-tej liczby pierwszej
-    # Dla n >= 6: p_n < n * (ln(n) + ln(ln(n)))
-    # Dla bezpieczeństwa używamy większego współczynnika
+    # Górna granica dla n-tej liczby pierwszej
+    # Dla n >= 6: p_n < n * (ln(n) + ln(ln(n)))  (Rosser)
+    # Dla n >= 39017: p_n <= n * (ln(n) + ln(ln(n)) - 0.9484)  (Dusart 1999)
     if n < 6:
         limit = 15
+    elif n < 39017:
+        limit = int(n * (math.log(n) + math.log(math.log(n)))) + 1
     else:
-        limit = int(n * (math.log(n) + math.log(math.log(n))) * 1.3)
+        limit = int(n * (math.log(n) + math.log(math.log(n)) - 0.9484)) + 1
 
     if verbose:
         print(f"Szacowany limit dla pierwszych {n} liczb pierwszych: {limit:,}")
 
-    primes = []
+    progress = ProgressLine(verbose)
+    progress.write(f"Generowanie liczb pierwszych do {limit:,}...")
+
+    primes = generate_primes(limit, verbose=False)
+
     while len(primes) < n:
-        if verbose:
-            print(f"Generowanie liczb pierwszych do {limit:,}...", end='\r', flush=True)
-        
-        primes = generate_primes(limit, verbose=False)
-        
-        if len(primes) < n:
-            # Zwiększ limit jeśli nie znaleziono wystarczającej liczby
-            limit = int(limit * 1.5)
-            if verbose:
-                print(f"Zwiększanie limitu do {limit:,}...", end='\r', flush=True)
+        # Zwiększ limit jeśli nie znaleziono wystarczającej liczby - przesiewany
+        # jest tylko nowy zakres, znalezione liczby pierwsze zostają
+        old_limit, limit = limit, int(limit * 1.5)
+        progress.write(f"Zwiększanie limitu do {limit:,}...")
 
-    if verbose:
-        print(" " * 70, end='\r', flush=True)  # Wyczyść linię postępu
+        generate_primes_segmented_continue(primes, old_limit, limit)
+
+    progress.clear()
 
     return primes[:n]
 
@@ -350,13 +1239,11 @@ def get_valid_limit() -> Optional[tuple[int, bool]]:
             print("❌ Zakres musi wynosić co najmniej 2.")
             return None
 
-        # Szacowanie pamięci: ~1 bajt na liczbę
-        estimated_mb = limit / 1024 / 1024
+        estimated_mb = estimate_sieve_mb(limit)
 
         if limit > 1_000_000_000:
             print(f"⚠️  BARDZO DUŻY zakres ({limit:,})!")
-            sqrt_limit = int(math.sqrt(limit))
-            segmented_mb = sqrt_limit / 1024 / 1024
+            segmented_mb = estimate_segmented_mb(limit)
             print(f"   Standardowe sito: ~{estimated_mb:.0f} MB (~{estimated_mb/1024:.1f} GB)")
             print(f"   Sito segmentowane: ~{segmented_mb:.0f} MB (zalecane!)")
             print(f"\n   💡 Sito segmentowane używa znacznie mniej pamięci dla dużych zakresów")
@@ -380,7 +1267,10 @@ def get_valid_limit() -> Optional[tuple[int, bool]]:
         return None
 
 
-def save_primes_to_file(primes: list[int], limit: int, filename: Optional[str] = None) -> None:
+SAVE_BATCH = 100_000  # Liczby formatowane i zapisywane jednym write (wielokrotność 10)
+
+
+def save_primes_to_file(primes: Sequence[int], limit: int, filename: Optional[str] = None) -> None:
     """Zapisuje liczby pierwsze do pliku tekstowego."""
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -389,31 +1279,34 @@ def save_primes_to_file(primes: list[int], limit: int, filename: Optional[str] =
         filename = f"{script_dir}/primes_up_to_{limit}_{timestamp}.txt"
 
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
+        with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
             f.write(f"Liczby pierwsze do {limit:,}\n")
             f.write(f"Liczba znalezionych: {len(primes):,}\n")
             f.write(f"Wygenerowano: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write("=" * 60 + "\n\n")
 
-            # Zapisz liczby pierwsze, 10 na linię
-            for i in range(0, len(primes), 10):
-                line = ', '.join(map(str, primes[i:i+10]))
-                f.write(line + '\n')
+            # Zapisz liczby pierwsze, 10 na linię, blokami po SAVE_BATCH liczb -
+            # jeden write na blok zamiast na linię (iteracyjnie - działa też dla PrimeSieve)
+            numbers = iter(primes)
+            while batch := list(map(str, islice(numbers, SAVE_BATCH))):
+                f.write('\n'.join(
+                    ', '.join(batch[i:i + 10]) for i in range(0, len(batch), 10)
+                ) + '\n')
 
         print(f"✅ Liczby pierwsze zapisano do: {filename}")
     except IOError as e:
         print(f"❌ Błąd podczas zapisu pliku: {e}")
 
 
-def analyze_primes(primes: list[int], limit: Optional[int] = None, first_n: Optional[int] = None) -> None:
+def analyze_primes(primes: Sequence[int], limit: Optional[int] = None, first_n: Optional[int] = None) -> None:
     """Wyświetla szczegółową analizę znalezionych liczb pierwszych.
 
     Args:
-        primes: Lista liczb pierwszych
+        primes: Lista liczb pierwszych lub PrimeSieve
         limit: Górny limit użyty do generowania (dla trybu z limitem)
         first_n: Liczba pierwszych n liczb pierwszych (dla trybu first n)
     """
-    if not primes:
+    if len(primes) == 0:
         print("\n📊 Nie znaleziono liczb pierwszych w tym zakresie.")
         return
 
@@ -505,9 +1398,10 @@ def main() -> int:
 
             try:
                 if use_segmented:
-                    primes = generate_primes_segmented(limit, verbose=verbose)
+                    # Strumieniowo - statystyki bez trzymania wszystkich liczb w pamięci
+                    primes = SegmentedPrimes(limit, verbose=verbose)
                 else:
-                    primes = generate_primes(limit, verbose=verbose)
+                    primes = sieve_primes(limit, verbose=verbose)
             except MemoryError as e:
                 print(f"\n❌ Błąd pamięci: {e}")
                 print("\n💡 Sugestie:")
@@ -13,28 +13,32 @@ def draw_triangle_3d(A, B, C):
     Rysuje trójkąt w przestrzeni 3D
     Sprawdza czy punkty tworzą trójkąt (nie są współliniowe i nie są identyczne)
     """
-    # Konwersja do numpy arrays
-    A = np.array(A)
-    B = np.array(B)
-    C = np.array(C)
+    # Wierzchołki jako jedna tablica (3, 3) - wiersze A, B, C
+    V = np.array([A, B, C], dtype=np.float64)
+    A, B, C = V
 
     # Sprawdzenie czy punkty są różne
     if np.array_equal(A, B) or np.array_equal(A, C) or np.array_equal(B, C):
         print("Błąd: Dwa lub więcej wierzchołków mają identyczne współrzędne. To nie jest trójkąt.")
         return
 
-    # Sprawdzenie współliniowości (wektory AB i AC muszą być liniowo niezależne)
-    AB = B - A
-    AC = C - A
-    cross = np.cross(AB, AC)
-    if np.allclose(cross, [0, 0, 0]):
+    # Krawędzie AB, AC, BC i ich środki - jedną operacją na wszystkich trzech
+    starts, ends = V[[0, 0, 1]], V[[1, 2, 2]]
+    edges = ends - starts
+    midpoints = (starts + ends) / 2
+
+    # Sprawdzenie współliniowości (wektory AB i AC muszą być liniowo niezależne):
+    # kwadrat długości iloczynu wektorowego AB x AC na liczbach Pythona
+    (abx, aby, abz), (acx, acy, acz) = edges[:2].tolist()
+    cx = aby * acz - abz * acy
+    cy = abz * acx - abx * acz
+    cz = abx * acy - aby * acx
+    if cx * cx + cy * cy + cz * cz < 1e-16:
         print("Błąd: Punkty są współliniowe. To nie jest trójkąt.")
         return
 
     # Długości boków
-    AB_len = np.linalg.norm(AB)
-    AC_len = np.linalg.norm(AC)
-    BC_len = np.linalg.norm(C - B)
+    AB_len, AC_len, BC_len = np.sqrt(np.einsum('ij,ij->i', edges, edges))
 
     print(f"\nWspółrzędne wierzchołków:")
     print(f"A = ({A[0]:.2f}, {A[1]:.2f}, {A[2]:.2f})")
@@ -51,20 +55,18 @@ def draw_triangle_3d(A, B, C):
     ax = fig.add_subplot(111, projection='3d')
     
     # Rysowanie krawędzi trójkąta
-    vertices = np.array([A, B, C, A])
+    vertices = V[[0, 1, 2, 0]]
     ax.plot(vertices[:, 0], vertices[:, 1], vertices[:, 2], 
             'b-', linewidth=2, label='Krawędzie')
     
     # Wypełnienie trójkąta
-    triangle = [[A, B, C]]
+    triangle = [V]
     poly = Poly3DCollection(triangle, alpha=0.3, facecolor='cyan', 
                            edgecolor='blue', linewidth=2)
     ax.add_collection3d(poly)
     
     # Rysowanie wierzchołków
-    vertices_array = np.array([A, B, C])
-    ax.scatter(vertices_array[:, 0], vertices_array[:, 1], 
-              vertices_array[:, 2], c='red', s=100, marker='o')
+    ax.scatter(V[:, 0], V[:, 1], V[:, 2], c='red', s=100, marker='o')
     
     # Oznaczenie wierzchołków
     ax.text(A[0], A[1], A[2], f'  A({A[0]:.1f},{A[1]:.1f},{A[2]:.1f})', 
@@ -75,9 +77,7 @@ def draw_triangle_3d(A, B, C):
            fontsize=12, color='red')
     
     # Oznaczenie długości boków
-    mid_AB = (A + B) / 2
-    mid_AC = (A + C) / 2
-    mid_BC = (B + C) / 2
+    mid_AB, mid_AC, mid_BC = midpoints
     ax.text(mid_AB[0], mid_AB[1], mid_AB[2], f'  {AB_len:.1f}', fontsize=10, color='green')
     ax.text(mid_AC[0], mid_AC[1], mid_AC[2], f'  {AC_len:.1f}', fontsize=10, color='green')
     ax.text(mid_BC[0], mid_BC[1], mid_BC[2], f'  {BC_len:.1f}', fontsize=10, color='green')
@@ -90,9 +90,8 @@ def draw_triangle_3d(A, B, C):
                 fontsize=14, fontweight='bold')
     
     # Ustawianie zakresów osi tak, by punkt (0,0,0) był zawsze widoczny w tym samym miejscu
-    all_points = np.array([A, B, C, [0, 0, 0]])
-    min_xyz = np.min(all_points, axis=0)
-    max_xyz = np.max(all_points, axis=0)
+    min_xyz = V.min(axis=0)
+    max_xyz = V.max(axis=0)
     # Zawsze obejmij zero na każdej osi
     min_x = min(0, min_xyz[0])
     min_y = min(0, min_xyz[1])
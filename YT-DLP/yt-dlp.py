@@ -8,13 +8,26 @@ Zawiera autoryzację cookie dla prywatnej/ograniczonej zawartości.
 """
 
 import os
+import re
 import sys
+import json
+import stat
+import time
+import sqlite3
+import queue
+import atexit
 import shutil
 import logging
+import subprocess
+import threading
+import logging.handlers
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
 from urllib.parse import urlparse
+from contextlib import closing
+from typing import Optional
 from enum import Enum
+from operator import itemgetter
 
 try:
     from yt_dlp import YoutubeDL
@@ -29,6 +42,62 @@ except ImportError as e:
 
 
 MAX_FILENAME_LENGTH = 180  # Maksymalna długość nazwy pliku
+CONCURRENT_FRAGMENTS = 8  # Fragmenty DASH/HLS pobierane równolegle
+HTTP_CHUNK_SIZE = 10 * 1024 * 1024  # Rozmiar zapytania dla pojedynczych plików (B)
+MAX_PARALLEL_DOWNLOADS = 4  # Filmy pobierane jednocześnie w trybie wsadowym
+PROBE_WORKERS = 8  # URL-e sprawdzane jednocześnie pod kątem ścieżek audio
+META_CACHE_FILE = Path.home() / '.cache' / 'yt-dlp-downloader' / 'metadata.sqlite'
+META_CACHE_TTL = 3600  # Czas ważności zapamiętanych ścieżek audio (s)
+LOG_BUFFER_RECORDS = 1024  # Wpisy logu buforowane przed zapisem do pliku
+
+# Opisy formatów, które nie mówią nic o języku ścieżki
+GENERIC_AUDIO_NOTES = frozenset(('DASH audio', 'audio only', 'm4a_dash'))
+
+LANGUAGE_NAMES = {
+    'pl': 'Polski',
+    'en': 'Angielski',
+    'de': 'Niemiecki',
+    'fr': 'Francuski',
+    'es': 'Hiszpański',
+    'it': 'Włoski',
+    'ru': 'Rosyjski',
+    'uk': 'Ukraiński',
+    'und': 'Nieokreślony'
+}
+
+BANNER = "\n".join([
+    "╔" + "═" * 58 + "╗",
+    "║" + " " * 21 + "POBIERANIE WIDEO" + " " * 21 + "║",
+    "║" + " " * 25 + "(yt-dlp)" + " " * 25 + "║",
+    "╚" + "═" * 58 + "╝\n",
+])
+
+# Typowy adres http(s) z prostą nazwą hosta - akceptowany bez urlparse.
+# Wszystko inne (IPv6, znaki spoza ASCII, nietypowe hosty) rozstrzyga urlparse
+SIMPLE_URL_RE = re.compile(r'https?://[a-z0-9.-]+(?::\d+)?(?:[/?#]\S*)?', re.IGNORECASE)
+
+OUTPUT_TEMPLATE = f'%(title).{MAX_FILENAME_LENGTH}B.%(ext)s'
+
+AUDIO_POSTPROCESSORS = ({
+    'key': 'FFmpegExtractAudio',
+    'preferredcodec': 'mp3',
+    'preferredquality': '192',
+},)
+
+VIDEO_POSTPROCESSORS = ({
+    'key': 'FFmpegVideoConvertor',
+    'preferedformat': 'mp4',
+},)
+
+VAAPI_DEVICE = '/dev/dri/renderD128'
+
+# Sprzętowe kodery H.264 w kolejności preferencji i ich argumenty dla ffmpeg
+HW_ENCODER_ARGS = {
+    'h264_videotoolbox': ['-c:v', 'h264_videotoolbox', '-q:v', '65'],
+    'h264_nvenc': ['-c:v', 'h264_nvenc', '-preset', 'p4', '-rc', 'vbr', '-cq', '23'],
+    'h264_vaapi': ['-vaapi_device', VAAPI_DEVICE, '-vf', 'format=nv12,hwupload',
+                   '-c:v', 'h264_vaapi', '-qp', '23'],
+}
 
 
 class Quality(Enum):
@@ -49,40 +118,58 @@ class DownloadMode(Enum):
 class ProgressBar:
     """Obsługa paska postępu dla pobierania yt-dlp."""
 
-    def __init__(self):
+    INTERVAL = 0.1  # Minimalny odstęp między aktualizacjami paska (s)
+
+    def __init__(self, position: int = 0):
+        self.position = position  # Wiersz paska, gdy kilka pobierań trwa naraz
         self.pbar: Optional[tqdm] = None
         self.last_downloaded: int = 0
+        self.last_update: float = 0.0
 
     def hook(self, d: dict) -> None:
         """Funkcja hook wywoływana przez yt-dlp podczas pobierania."""
-        if d['status'] == 'downloading':
-            total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
+        status = d['status']
+        pbar = self.pbar
+
+        if status == 'downloading':
+            # yt-dlp wywołuje hook setki razy na sekundę - przyrosty sumują się
+            # w last_downloaded, więc pominięte wywołania niczego nie gubią
+            now = time.monotonic()
+            if pbar and now - self.last_update < self.INTERVAL:
+                return
+            self.last_update = now
+
             downloaded = d.get('downloaded_bytes', 0)
 
-            if not self.pbar and total_bytes:
-                self.pbar = tqdm(
+            if not pbar:
+                total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
+                if not total_bytes:
+                    return
+                pbar = self.pbar = tqdm(
                     total=total_bytes,
                     unit='B',
                     unit_scale=True,
                     desc='Pobieranie',
                     ascii=True,
-                    ncols=80
+                    ncols=80,
+                    position=self.position,
+                    mininterval=self.INTERVAL,
+                    maxinterval=1.0
                 )
                 self.last_downloaded = 0
 
-            if self.pbar:
-                increment = downloaded - self.last_downloaded
-                if increment > 0:
-                    self.pbar.update(increment)
-                    self.last_downloaded = downloaded
+            increment = downloaded - self.last_downloaded
+            if increment > 0:
+                pbar.update(increment)
+                self.last_downloaded = downloaded
 
-        elif d['status'] == 'finished':
-            if self.pbar:
-                if self.pbar.total:
-                    remaining = self.pbar.total - self.pbar.n
+        elif status == 'finished':
+            if pbar:
+                if pbar.total:
+                    remaining = pbar.total - pbar.n
                     if remaining > 0:
-                        self.pbar.update(remaining)
-                self.pbar.close()
+                        pbar.update(remaining)
+                pbar.close()
                 self.pbar = None
                 self.last_downloaded = 0
 
@@ -107,16 +194,79 @@ def check_dependencies() -> bool:
         all_ok = False
 
     if not shutil.which("ffmpeg"):
-        print("❌ ffmpeg nie został znaleziony!")
-        print("\n📦 Instalacja:")
-        print("   macOS:    brew install ffmpeg")
-        print("   Ubuntu:   sudo apt install ffmpeg")
-        print("   Windows:  choco install ffmpeg")
+        print("\n".join([
+            "❌ ffmpeg nie został znaleziony!",
+            "\n📦 Instalacja:",
+            "   macOS:    brew install ffmpeg",
+            "   Ubuntu:   sudo apt install ffmpeg",
+            "   Windows:  choco install ffmpeg",
+        ]))
         all_ok = False
 
     return all_ok
 
 
+_hw_encoder: Optional[str] = None
+_hw_encoder_checked = False
+_hw_encoder_lock = threading.Lock()
+
+
+def _hw_encoder_works(ffmpeg: str, encoder: str) -> bool:
+    """Koduje jedną klatkę testową - sama obecność na liście `ffmpeg -encoders` nie wystarcza."""
+    args = HW_ENCODER_ARGS[encoder]
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error']
+    if args[0] == '-vaapi_device':
+        cmd += args[:2]
+        args = args[2:]
+    cmd += ['-f', 'lavfi', '-i', 'color=size=256x256:duration=0.1', '-frames:v', '1',
+            *args, '-f', 'null', '-']
+    try:
+        return subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL, timeout=15).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+def detect_hw_encoder() -> Optional[str]:
+    """
+    Zwraca sprzętowy koder H.264 dostępny w ffmpeg albo None (libx264).
+
+    Sprawdzane raz na uruchomienie programu. Pobieranie wsadowe woła tę funkcję
+    z kilku wątków naraz - pozostałe czekają na wynik zamiast od razu dostać None.
+    """
+    global _hw_encoder, _hw_encoder_checked
+    with _hw_encoder_lock:
+        if not _hw_encoder_checked:
+            _hw_encoder = _find_hw_encoder()
+            _hw_encoder_checked = True
+        return _hw_encoder
+
+
+def _find_hw_encoder() -> Optional[str]:
+    """Wybiera pierwszy działający koder sprzętowy dla tej platformy."""
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        return None
+    try:
+        listed = subprocess.run([ffmpeg, '-hide_banner', '-encoders'], capture_output=True,
+                                text=True, timeout=15).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    if sys.platform == 'darwin':
+        candidates = ['h264_videotoolbox']
+    else:
+        candidates = ['h264_nvenc']
+        if os.path.exists(VAAPI_DEVICE):
+            candidates.append('h264_vaapi')
+
+    for encoder in candidates:
+        if encoder in listed and _hw_encoder_works(ffmpeg, encoder):
+            logging.info(f"Sprzętowy koder wideo: {encoder}")
+            return encoder
+    return None
+
+
 def find_cookie_file() -> Optional[Path]:
     """
     Znajduje plik cookie w typowych lokalizacjach.
@@ -130,16 +280,22 @@ def find_cookie_file() -> Optional[Path]:
     ]
 
     for location in possible_locations:
-        if location.exists() and location.is_file():
-            try:
-                with open(location, 'r', encoding='utf-8') as f:
-                    first_line = f.readline().strip()
-                    if first_line.startswith('#') or '\t' in first_line:
-                        logging.info(f"Znaleziono plik cookie: {location}")
-                        return location
-            except Exception as e:
-                logging.warning(f"Błąd podczas czytania pliku cookie {location}: {e}")
+        # Jedno stat zamiast osobnych exists() i is_file()
+        try:
+            if not stat.S_ISREG(location.stat().st_mode):
                 continue
+        except OSError:
+            continue
+
+        try:
+            with open(location, 'rb') as f:
+                first_line = f.readline().strip()
+                if first_line.startswith(b'#') or b'\t' in first_line:
+                    logging.info(f"Znaleziono plik cookie: {location}")
+                    return location
+        except Exception as e:
+            logging.warning(f"Błąd podczas czytania pliku cookie {location}: {e}")
+            continue
 
     return None
 
@@ -152,11 +308,12 @@ def validate_cookie_file(cookie_path: Path) -> bool:
         return False
 
     try:
-        with open(cookie_path, 'r', encoding='utf-8') as f:
-            content = f.read(500)
-            return ('# Netscape HTTP Cookie File' in content or
-                    '# HTTP Cookie File' in content or
-                    '\t' in content)
+        # Bajty zamiast tekstu - znaczniki są w ASCII, dekodowanie UTF-8 niepotrzebne
+        with open(cookie_path, 'rb') as f:
+            content = f.read(512)
+            return (b'# Netscape HTTP Cookie File' in content or
+                    b'# HTTP Cookie File' in content or
+                    b'\t' in content)
     except Exception:
         return False
 
@@ -166,107 +323,248 @@ def validate_url(url: str) -> bool:
     Waliduje czy ciąg znaków jest prawidłowym URL.
     """
     url = url.strip()
-    if not url:
-        return False
+    if SIMPLE_URL_RE.fullmatch(url):
+        return True
 
     try:
         result = urlparse(url)
-        return all([result.scheme in ['http', 'https'], result.netloc])
-    except Exception:
+        return result.scheme in ('http', 'https') and bool(result.netloc)
+    except ValueError:
         return False
 
 
+_probe_ydls: dict[tuple[Optional[str], int], YoutubeDL] = {}
+_probe_lock = threading.Lock()
+_probe_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_probe_pool() -> ThreadPoolExecutor:
+    """
+    Zwraca pulę wątków sprawdzających ścieżki audio (wspólną dla wszystkich rund).
+
+    Pula żyje przez cały program, żeby jej wątki zachowały swoje instancje
+    YoutubeDL między rundami; przy wyjściu zamyka ją _shutdown_probe_pool.
+    """
+    global _probe_pool
+    if _probe_pool is None:
+        _probe_pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS)
+    return _probe_pool
+
+
+def _shutdown_probe_pool() -> None:
+    """
+    Zamyka pulę bez czekania i anuluje sprawdzenia, które jeszcze nie ruszyły.
+
+    Wywoływane przy wyjściu z programu (także po Ctrl-C) - inaczej
+    concurrent.futures czekałby na wszystkie zlecone zapytania sieciowe.
+    """
+    global _probe_pool
+    if _probe_pool is not None:
+        _probe_pool.shutdown(wait=False, cancel_futures=True)
+        _probe_pool = None
+
+
+def _get_probe_ydl(cookie_file: Optional[Path]) -> YoutubeDL:
+    """
+    Zwraca instancję YoutubeDL do sprawdzania ścieżek audio, tworzoną raz na wątek.
+
+    YoutubeDL nie jest bezpieczny wątkowo, więc każdy wątek puli ma własną;
+    kolejne URL-e korzystają z już zainicjalizowanych ekstraktorów, pobranego
+    player.js i otwartych połączeń HTTP. Zamykane przy wyjściu z programu.
+    """
+    key = (str(cookie_file) if cookie_file else None, threading.get_ident())
+    with _probe_lock:
+        ydl = _probe_ydls.get(key)
+        if ydl is None:
+            ydl_opts = {
+                'quiet': True,
+                'no_warnings': True,
+                'skip_download': True,
+                # Playlista: bez ekstrakcji każdego elementu (i tak nie ma formatów)
+                'extract_flat': 'discard_in_playlist',
+            }
+            if cookie_file:
+                ydl_opts['cookiefile'] = str(cookie_file)
+            ydl = _probe_ydls[key] = YoutubeDL(ydl_opts)
+    return ydl
+
+
+@atexit.register
+def _close_probe_ydls() -> None:
+    """Zamyka współdzielone instancje YoutubeDL (m.in. zapisuje cookies)."""
+    _shutdown_probe_pool()
+    with _probe_lock:
+        for ydl in _probe_ydls.values():
+            ydl.close()
+        _probe_ydls.clear()
+
+
+def _connect_meta_cache() -> sqlite3.Connection:
+    """Otwiera bazę pamięci podręcznej metadanych (tworzy ją przy pierwszym użyciu)."""
+    META_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(META_CACHE_FILE, timeout=5)
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS audio_tracks ('
+        'url TEXT, cookies TEXT, ts REAL, tracks TEXT, PRIMARY KEY (url, cookies))'
+    )
+    return conn
+
+
+def load_cached_audio_tracks(url: str, cookie_file: Optional[Path] = None) -> Optional[list[dict]]:
+    """
+    Zwraca ścieżki audio zapamiętane dla URL-a, jeśli są młodsze niż META_CACHE_TTL.
+
+    Zapamiętywana jest tylko gotowa lista ścieżek (identyfikatory formatów),
+    nie adresy strumieni, które po pewnym czasie wygasają.
+    """
+    try:
+        with closing(_connect_meta_cache()) as conn:
+            row = conn.execute(
+                'SELECT ts, tracks FROM audio_tracks WHERE url = ? AND cookies = ?',
+                (url, str(cookie_file or '')),
+            ).fetchone()
+    except (OSError, sqlite3.Error) as e:
+        logging.warning(f"Pamięć podręczna metadanych niedostępna: {e}")
+        return None
+
+    if row is None:
+        return None
+
+    try:
+        if time.time() - row[0] > META_CACHE_TTL:
+            return None
+        tracks = json.loads(row[1])
+        if not isinstance(tracks, list) or not all(isinstance(t, dict) for t in tracks):
+            raise ValueError("oczekiwano listy słowników")
+    except (TypeError, ValueError) as e:
+        # Uszkodzony wpis traktujemy jak brak - i usuwamy, żeby nie wracał
+        logging.warning(f"Uszkodzony wpis pamięci podręcznej dla {url}: {e}")
+        _delete_cached_audio_tracks(url, cookie_file)
+        return None
+
+    logging.info(f"Ścieżki audio z pamięci podręcznej dla {url}")
+    return tracks
+
+
+def _delete_cached_audio_tracks(url: str, cookie_file: Optional[Path]) -> None:
+    """Usuwa wpis URL-a z pamięci podręcznej metadanych."""
+    try:
+        with closing(_connect_meta_cache()) as conn, conn:
+            conn.execute(
+                'DELETE FROM audio_tracks WHERE url = ? AND cookies = ?',
+                (url, str(cookie_file or '')),
+            )
+    except (OSError, sqlite3.Error) as e:
+        logging.warning(f"Nie udało się usunąć wpisu z pamięci podręcznej: {e}")
+
+
+def store_cached_audio_tracks(url: str, cookie_file: Optional[Path], audio_tracks: list[dict]) -> None:
+    """Zapamiętuje ścieżki audio URL-a w pamięci podręcznej metadanych."""
+    try:
+        with closing(_connect_meta_cache()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO audio_tracks VALUES (?, ?, ?, ?)',
+                (url, str(cookie_file or ''), time.time(), json.dumps(audio_tracks)),
+            )
+    except (OSError, sqlite3.Error) as e:
+        logging.warning(f"Nie udało się zapisać metadanych w pamięci podręcznej: {e}")
+
+
+def clear_metadata_cache() -> None:
+    """Usuwa wszystkie zapamiętane metadane."""
+    try:
+        with closing(_connect_meta_cache()) as conn, conn:
+            deleted = conn.execute('DELETE FROM audio_tracks').rowcount
+        print(f"🧹 Usunięto zapamiętane metadane: {deleted} URL(i)")
+        logging.info(f"Wyczyszczono pamięć podręczną metadanych ({deleted})")
+    except (OSError, sqlite3.Error) as e:
+        print(f"❌ Nie udało się wyczyścić pamięci podręcznej: {e}")
+
+
 def get_audio_tracks(url: str, cookie_file: Optional[Path] = None) -> list[dict]:
     """
     Pobiera listę dostępnych ścieżek dźwiękowych z wideo.
-    """
-    ydl_opts = {
-        'quiet': True,
-        'no_warnings': True,
-        'skip_download': True,
-    }
 
-    if cookie_file and validate_cookie_file(cookie_file):
-        ydl_opts['cookiefile'] = str(cookie_file)
+    Wynik jest zapamiętywany na dysku (META_CACHE_TTL), więc ponowne podanie
+    tego samego URL-a w kolejnej rundzie nie odpytuje serwisu.
+    cookie_file musi być już zwalidowany (setup_session).
+    """
+    cached = load_cached_audio_tracks(url, cookie_file)
+    if cached is not None:
+        return cached
 
     try:
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            if not info:
-                return []
-
-            audio_tracks = []
-            formats = info.get('formats', [])
-
-            for fmt in formats:
-                acodec = fmt.get('acodec', 'none')
-                vcodec = fmt.get('vcodec', 'none')
-
-                if acodec == 'none' or not acodec:
-                    continue
-                if vcodec != 'none':
-                    continue
-
-                format_id = fmt.get('format_id', '')
-                format_note = fmt.get('format_note', '')
-                ext = fmt.get('ext', 'unknown')
-                abr = fmt.get('abr', 0) or 0
-
-                lang = fmt.get('language', '')
-                if not lang or lang == 'und':
-                    format_lower = format_id.lower()
-                    if 'pol' in format_lower or 'pl' in format_lower:
-                        lang = 'pl'
-                    elif 'eng' in format_lower or 'en' in format_lower:
-                        lang = 'en'
-                    else:
-                        lang = 'und'
-
-                display_name = format_note
-                if not display_name or display_name in ['DASH audio', 'audio only', 'm4a_dash']:
-                    if 'audiodeskrypcja' in format_id.lower():
-                        display_name = 'Audiodeskrypcja'
-                    elif 'polski' in format_id.lower():
-                        display_name = 'Polski'
-                    elif 'english' in format_id.lower() or 'eng' in format_id.lower():
-                        display_name = 'Angielski'
-                    else:
-                        lang_map = {
-                            'pl': 'Polski',
-                            'en': 'Angielski',
-                            'de': 'Niemiecki',
-                            'fr': 'Francuski',
-                            'es': 'Hiszpański',
-                            'it': 'Włoski',
-                            'ru': 'Rosyjski',
-                            'uk': 'Ukraiński',
-                            'und': 'Nieokreślony'
-                        }
-                        display_name = lang_map.get(lang, lang)
-
-                tech_details = []
-                if 'dash' in format_note.lower() or 'dash' in format_id.lower():
-                    tech_details.append('DASH')
-                if 'm3u8' in ext or 'hls' in format_note.lower():
-                    tech_details.append('HLS')
-                if tech_details:
-                    display_name = f"{display_name} ({', '.join(tech_details)})"
-
-                if 'audiodeskrypcja' in display_name.lower() or 'audiodeskrypcja' in format_id.lower():
-                    continue
-
-                audio_tracks.append({
-                    'language': lang,
-                    'language_name': display_name,
-                    'format_id': format_id,
-                    'format_note': format_note,
-                    'ext': ext,
-                    'abr': abr,
-                })
-
-            audio_tracks.sort(key=lambda x: -x['abr'])
-            logging.info(f"Znaleziono {len(audio_tracks)} ścieżek audio dla {url}")
-            return audio_tracks
+        ydl = _get_probe_ydl(cookie_file)
+        # process=False: surowa lista formatów z ekstraktora - bez sortowania
+        # i wyboru formatów, napisów ani miniatur, których tu nie potrzeba
+        info = ydl.extract_info(url, download=False, process=False)
+        if info and info.get('_type', 'video') != 'video':
+            # Przekierowanie do innego ekstraktora trzeba rozwiązać w pełni
+            info = ydl.process_ie_result(info, download=False)
+        if not info:
+            return []
+
+        # Tylko formaty audio (bez obrazu)
+        audio_formats = [
+            fmt for fmt in info.get('formats', [])
+            if fmt.get('acodec', 'none') not in ('none', None, '')
+            and fmt.get('vcodec', 'none') == 'none'
+        ]
+
+        audio_tracks = []
+        for fmt in audio_formats:
+            format_id = fmt.get('format_id', '')
+            format_note = fmt.get('format_note', '')
+            ext = fmt.get('ext', 'unknown')
+            abr = fmt.get('abr', 0) or 0
+
+            # Małe litery liczone raz na format zamiast przy każdym porównaniu
+            id_lower = format_id.lower()
+            note_lower = format_note.lower()
+
+            # Audiodeskrypcję odrzucamy od razu, zanim zbudujemy opis ścieżki
+            if 'audiodeskrypcja' in id_lower or 'audiodeskrypcja' in note_lower:
+                continue
+
+            lang = fmt.get('language', '')
+            if not lang or lang == 'und':
+                if 'pol' in id_lower or 'pl' in id_lower:
+                    lang = 'pl'
+                elif 'eng' in id_lower or 'en' in id_lower:
+                    lang = 'en'
+                else:
+                    lang = 'und'
+
+            display_name = format_note
+            if not display_name or display_name in GENERIC_AUDIO_NOTES:
+                if 'polski' in id_lower:
+                    display_name = 'Polski'
+                elif 'english' in id_lower or 'eng' in id_lower:
+                    display_name = 'Angielski'
+                else:
+                    display_name = LANGUAGE_NAMES.get(lang, lang)
+
+            tech_details = []
+            if 'dash' in note_lower or 'dash' in id_lower:
+                tech_details.append('DASH')
+            if 'm3u8' in ext or 'hls' in note_lower:
+                tech_details.append('HLS')
+            if tech_details:
+                display_name = f"{display_name} ({', '.join(tech_details)})"
+
+            audio_tracks.append({
+                'language': lang,
+                'language_name': display_name,
+                'format_id': format_id,
+                'format_note': format_note,
+                'ext': ext,
+                'abr': abr,
+            })
+
+        audio_tracks.sort(key=itemgetter('abr'), reverse=True)
+        logging.info(f"Znaleziono {len(audio_tracks)} ścieżek audio dla {url}")
+        store_cached_audio_tracks(url, cookie_file, audio_tracks)
+        return audio_tracks
 
     except Exception as e:
         logging.error(f"Błąd podczas pobierania informacji o ścieżkach audio: {e}")
@@ -326,57 +624,62 @@ def download_video(
     quality: Quality = Quality.BEST,
     mode: DownloadMode = DownloadMode.VIDEO,
     cookie_file: Optional[Path] = None,
-    audio_format_id: Optional[str] = None
+    audio_format_id: Optional[str] = None,
+    progress_position: int = 0,
+    show_header: bool = True
 ) -> bool:
     """
     Pobiera wideo z URL.
+
+    cookie_file musi być już zwalidowany, a output_path istnieć (setup_session) -
+    nie są ponownie sprawdzane przy każdym pobraniu.
+    show_header=False pomija opis pobrania - pobieranie wsadowe wypisuje go
+    raz dla wszystkich URL-i, zamiast między paskami postępu równoległych pobrań.
     """
-    output_path.mkdir(parents=True, exist_ok=True)
-    progress = ProgressBar()
+    progress = ProgressBar(progress_position)
 
     ydl_opts = {
         'format': quality.value,
-        'outtmpl': str(output_path / '%(title).180B.%(ext)s'),
+        'outtmpl': str(output_path / OUTPUT_TEMPLATE),
         'progress_hooks': [progress.hook],
         'noplaylist': True,
         'quiet': True,
         'no_warnings': True,
         'restrictfilenames': True,
         'windowsfilenames': True,
+        'concurrent_fragment_downloads': CONCURRENT_FRAGMENTS,
+        'http_chunk_size': HTTP_CHUNK_SIZE,
     }
 
     if audio_format_id:
         ydl_opts['format'] = f"bestvideo+{audio_format_id}/{quality.value}"
         logging.info(f"Wybrany format audio: {audio_format_id}")
 
-    if cookie_file and validate_cookie_file(cookie_file):
+    if cookie_file:
         ydl_opts['cookiefile'] = str(cookie_file)
         logging.info(f"Używam pliku cookie: {cookie_file}")
 
     if mode == DownloadMode.AUDIO or quality == Quality.AUDIO_ONLY:
         ydl_opts['format'] = 'bestaudio/best'
-        ydl_opts['postprocessors'] = [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': '192',
-        }]
-        ydl_opts['outtmpl'] = str(output_path / '%(title).180B.%(ext)s')
+        ydl_opts['postprocessors'] = list(AUDIO_POSTPROCESSORS)
     else:
         ydl_opts['merge_output_format'] = 'mp4'
-        ydl_opts['postprocessors'] = [{
-            'key': 'FFmpegVideoConvertor',
-            'preferedformat': 'mp4',
-        }]
-
-    mode_str = "🎵 Audio" if mode == DownloadMode.AUDIO else "🎬 Wideo"
-    print(f"📥 Pobieranie {mode_str} z: {url}")
-    print(f"📂 Katalog wyjściowy: {output_path}")
-    print(f"⚙️  Jakość: {quality.name}")
-    if audio_format_id:
-        print(f"🔊 Format audio: {audio_format_id}")
-    if cookie_file and validate_cookie_file(cookie_file):
-        print(f"🍪 Cookies: {cookie_file.name}")
-    print()
+        ydl_opts['postprocessors'] = list(VIDEO_POSTPROCESSORS)
+        # Konwersja do mp4 na koderze GPU zamiast programowego libx264
+        hw_encoder = detect_hw_encoder()
+        if hw_encoder:
+            ydl_opts['postprocessor_args'] = {'videoconvertor': HW_ENCODER_ARGS[hw_encoder]}
+
+    if show_header:
+        mode_str = "🎵 Audio" if mode == DownloadMode.AUDIO else "🎬 Wideo"
+        print(f"📥 Pobieranie {mode_str} z: {url}")
+        print(f"📂 Katalog wyjściowy: {output_path}")
+        print(f"⚙️  Jakość: {quality.name}")
+        if audio_format_id:
+            print(f"🔊 Format audio: {audio_format_id}")
+        if cookie_file:
+            print(f"🍪 Cookies: {cookie_file.name}")
+        print()
 
     try:
         with YoutubeDL(ydl_opts) as ydl:
@@ -391,7 +694,7 @@ def download_video(
                 return True
     except Exception as e:
         error_msg = str(e)
-        print(f"\n❌ Błąd pobierania: {error_msg}")
+        print(f"\n❌ Błąd pobierania {url}: {error_msg}")
         logging.error(f"Pobieranie nieudane dla {url}: {error_msg}")
         return False
     finally:
@@ -415,6 +718,13 @@ def get_output_directory() -> Path:
             if create not in ['t', 'tak']:
                 print("Używam bieżącego katalogu.")
                 return current_dir
+            # Katalog tworzony raz na sesję, nie przy każdym pobraniu
+            try:
+                path.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                print(f"❌ Nie udało się utworzyć katalogu: {e}")
+                print("Używam bieżącego katalogu.")
+                return current_dir
         return path
 
     return current_dir
@@ -427,19 +737,55 @@ def download_batch(
     mode: DownloadMode,
     cookie_file: Optional[Path] = None
 ) -> tuple[int, int]:
-    """Pobiera wiele filmów z odpowiednimi ścieżkami audio."""
-    successful = 0
-    failed = 0
-    total = len(url_audio_pairs)
+    """
+    Pobiera wiele filmów z odpowiednimi ścieżkami audio.
 
-    print(f"\n📦 Pobieranie wsadowe: {total} URL(i)\n")
+    Do MAX_PARALLEL_DOWNLOADS filmów pobiera się naraz (wątki - czas zajmuje
+    sieć i ffmpeg uruchamiany jako osobny proces, nie Python).
+    """
+    total = len(url_audio_pairs)
+    workers = min(MAX_PARALLEL_DOWNLOADS, total)
 
+    mode_str = "🎵 Audio" if mode == DownloadMode.AUDIO else "🎬 Wideo"
+    lines = [
+        f"\n📦 Pobieranie wsadowe: {total} URL(i), {workers} naraz",
+        f"📥 Tryb: {mode_str}",
+        f"📂 Katalog wyjściowy: {output_path}",
+        f"⚙️  Jakość: {quality.name}",
+    ]
+    if cookie_file:
+        lines.append(f"🍪 Cookies: {cookie_file.name}")
     for i, (url, audio_format) in enumerate(url_audio_pairs, 1):
-        print(f"\n[{i}/{total}] {'='*50}")
-        if download_video(url, output_path, quality, mode, cookie_file, audio_format):
-            successful += 1
-        else:
-            failed += 1
+        audio_str = f" (🔊 {audio_format})" if audio_format else ""
+        lines.append(f"   [{i}/{total}] {url}{audio_str}")
+    print("\n".join(lines) + "\n")
+
+    # Wolne wiersze pasków postępu - każde trwające pobieranie zajmuje jeden
+    positions: queue.Queue[int] = queue.Queue()
+    for position in range(workers):
+        positions.put(position)
+
+    def download(url: str, audio_format: Optional[str]) -> bool:
+        position = positions.get()
+        try:
+            return download_video(url, output_path, quality, mode, cookie_file, audio_format,
+                                  position, show_header=False)
+        finally:
+            positions.put(position)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = [
+        executor.submit(download, url, audio_format)
+        for url, audio_format in url_audio_pairs
+    ]
+    try:
+        successful = sum(future.result() for future in futures)
+    except BaseException:
+        # Ctrl-C: nie zaczynamy kolejnych pobrań, kończą się tylko trwające
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    failed = total - successful
 
     print(f"\n{'='*60}")
     print(f"📊 Zakończono wsadowo: ✅ {successful} sukcesów, ❌ {failed} błędów")
@@ -450,12 +796,25 @@ def download_batch(
 
 def setup_logging() -> None:
     """Konfiguruje logowanie (raz na start)."""
+    log_format = '%(asctime)s - %(levelname)s - %(message)s'
     log_file = Path.cwd() / 'yt-dlp-downloader.log'
+
+    # Plik otwierany przy pierwszym zapisie; wpisy zbierane w pamięci i zapisywane
+    # porcjami - od razu przy ostrzeżeniu lub błędzie oraz przy zamknięciu programu
+    file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
+    file_handler.setFormatter(logging.Formatter(log_format))
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=LOG_BUFFER_RECORDS,
+        flushLevel=logging.WARNING,
+        target=file_handler,
+        flushOnClose=True
+    )
+
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
+        format=log_format,
         handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
+            buffered_handler,
             logging.StreamHandler(sys.stdout) if os.getenv('DEBUG') else logging.NullHandler()
         ]
     )
@@ -464,6 +823,7 @@ def setup_logging() -> None:
 def setup_session() -> tuple[Optional[Path], bool, Path]:
     """
     Ustawienia wybierane raz (cookies + katalog wyjściowy).
+    Plik cookie jest walidowany tylko tutaj - zwracany cookie_file jest poprawny lub None.
     Zwraca: (cookie_file, use_cookies, output_path)
     """
     cookie_file = find_cookie_file()
@@ -474,7 +834,11 @@ def setup_session() -> tuple[Optional[Path], bool, Path]:
         print("   (Przydatne dla prywatnych filmów, treści z ograniczeniem wiekowym, tylko dla członków)")
         response = input("   Użyć tego pliku cookie? (T/N) [T]: ").strip().lower()
         use_cookies = response in ['', 't', 'tak']
-        if use_cookies:
+        if use_cookies and not validate_cookie_file(cookie_file):
+            print("   ⚠️  Nieprawidłowy format pliku cookie, kontynuuję bez cookies")
+            cookie_file = None
+            use_cookies = False
+        elif use_cookies:
             logging.info(f"Użytkownik wybrał użycie pliku cookie: {cookie_file}")
         else:
             cookie_file = None
@@ -499,25 +863,30 @@ def setup_session() -> tuple[Optional[Path], bool, Path]:
 
 def run_download_round(cookie_file: Optional[Path], use_cookies: bool, output_path: Path) -> int:
     """Jedna runda pobierania (zbieranie URL-i i pobranie)."""
-    print("🔗 Obsługiwane: YouTube, TikTok, Vimeo, Facebook, Instagram, Twitter, itd.")
-    print("📺 Jakość: Zawsze NAJLEPSZA (wideo + audio)")
-    print("🔊 Audio: Automatyczny wybór najlepszej ścieżki (bez audiodeskrypcji)")
-    print(f"📂 Katalog wyjściowy: {output_path}")
-    if cookie_file and use_cookies and validate_cookie_file(cookie_file):
-        print(f"🍪 Cookies: {cookie_file}")
-    else:
-        print("🍪 Cookies: brak / wyłączone")
-    print("\n   Wprowadź adresy URL (każdy w nowej linii, pusta linia kończy):\n")
+    cookies_str = str(cookie_file) if cookie_file and use_cookies else "brak / wyłączone"
+    print("\n".join([
+        "🔗 Obsługiwane: YouTube, TikTok, Vimeo, Facebook, Instagram, Twitter, itd.",
+        "📺 Jakość: Zawsze NAJLEPSZA (wideo + audio)",
+        "🔊 Audio: Automatyczny wybór najlepszej ścieżki (bez audiodeskrypcji)",
+        f"📂 Katalog wyjściowy: {output_path}",
+        f"🍪 Cookies: {cookies_str}",
+        "\n   Wprowadź adresy URL (każdy w nowej linii, pusta linia kończy):\n",
+    ]))
 
     url_audio_pairs: list[tuple[str, Optional[str]]] = []
+    probes: list[tuple[str, Future]] = []
     url_count = 0
 
+    # Ścieżki audio są sprawdzane w tle od razu po podaniu URL-a - zapytania
+    # sieciowe nakładają się na siebie i na wpisywanie kolejnych adresów.
+    # Pula jest wspólna dla rund, więc wątki zachowują swoje instancje YoutubeDL
+    pool = _get_probe_pool()
     while True:
         url_count += 1
         url = input(f"   URL #{url_count}: ").strip()
 
         if not url:
-            if url_audio_pairs:
+            if probes:
                 break
             else:
                 print("   Wprowadź przynajmniej jeden adres URL")
@@ -529,16 +898,17 @@ def run_download_round(cookie_file: Optional[Path], use_cookies: bool, output_pa
             url_count -= 1
             continue
 
-        print("🔍 Sprawdzanie ścieżek audio...")
-        audio_tracks = get_audio_tracks(url, cookie_file if use_cookies else None)
-        audio_format_id = select_audio_track(audio_tracks)
-
-        url_audio_pairs.append((url, audio_format_id))
+        probes.append((url, pool.submit(get_audio_tracks, url, cookie_file if use_cookies else None)))
 
-        print(f"✅ URL #{url_count} dodany")
+        print(f"✅ URL #{url_count} dodany (🔍 sprawdzanie ścieżek audio w tle)")
         if url_count == 1:
             print("   (wciśnij Enter, aby zakończyć lub podaj kolejny URL)\n")
 
+    for i, (url, probe) in enumerate(probes, 1):
+        print(f"\n🔍 Ścieżki audio dla URL #{i}: {url}")
+        audio_format_id = select_audio_track(probe.result())
+        url_audio_pairs.append((url, audio_format_id))
+
     quality = Quality.BEST
     mode = DownloadMode.VIDEO
 
@@ -571,10 +941,7 @@ def main() -> int:
     """Główna funkcja programu (menu po każdej rundzie)."""
     setup_logging()
 
-    print("╔" + "═" * 58 + "╗")
-    print("║" + " " * 21 + "POBIERANIE WIDEO" + " " * 21 + "║")
-    print("║" + " " * 25 + "(yt-dlp)" + " " * 25 + "║")
-    print("╚" + "═" * 58 + "╝\n")
+    print(BANNER)
 
     if not check_dependencies():
         return 1
@@ -587,10 +954,13 @@ def main() -> int:
         print()
         last_rc = run_download_round(cookie_file, use_cookies, output_path)
 
-        print("\nCo dalej?")
-        print("   1. Nowe pobranie")
-        print("   2. Wyjście")
-        print("   3. Zmień ustawienia (cookies / katalog wyjściowy)")
+        print("\n".join([
+            "\nCo dalej?",
+            "   1. Nowe pobranie",
+            "   2. Wyjście",
+            "   3. Zmień ustawienia (cookies / katalog wyjściowy)",
+            "   4. Wyczyść zapamiętane metadane",
+        ]))
 
         choice = input("   Wybór [1]: ").strip() or "1"
         if choice == "1":
@@ -601,8 +971,11 @@ def main() -> int:
             print("\n⚙️  Zmiana ustawień...\n")
             cookie_file, use_cookies, output_path = setup_session()
             continue
+        elif choice == "4":
+            clear_metadata_cache()
+            continue
         else:
-            print("   ⚠️  Nieprawidłowy wybór. Wpisz 1, 2 lub 3.\n")
+            print("   ⚠️  Nieprawidłowy wybór. Wpisz 1, 2, 3 lub 4.\n")
 
 
 if __name__ == "__main__":
@@ -614,3 +987,7 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\n❌ Nieoczekiwany błąd: {e}")
         sys.exit(1)
+    finally:
+        # Przed zamknięciem interpretera, który czeka na wątki puli - handler
+        # atexit uruchamia się dopiero po tym oczekiwaniu
+        _shutdown_probe_pool()